@@ -30,14 +30,21 @@ def run_command(cmd, description):
     return result.returncode
 
 
+# pytest-xdist worker count for --parallel; None runs tests in one process
+PARALLEL_WORKERS = None
+
+
 def get_base_cmd():
     """Get the base pytest command with common options."""
-    return [
+    cmd = [
         sys.executable, "-m", "pytest", 
         "tests/", 
         "-v", 
         "--tb=short"
     ]
+    if PARALLEL_WORKERS:
+        cmd.extend(["-n", PARALLEL_WORKERS])
+    return cmd
 
 
 def run_unit_tests(coverage=False, verbose=False):
@@ -101,6 +108,7 @@ def run_all_tests(coverage=False):
     """Run all tests (unit + integration + slow)."""
     cmd = get_base_cmd()
     cmd.extend([
+        "-m", "",  # Override pytest.ini's default "not slow"
         "--timeout=600",
         "--tb=short"
     ])
@@ -167,6 +175,7 @@ Examples:
   %(prog)s --unit --coverage         # Run unit tests with coverage
   %(prog)s --fast                    # Run fastest tests only
   %(prog)s --video                   # Run video processing tests
+  %(prog)s --video --parallel        # Run video tests on every CPU
   %(prog)s --all                     # Run all tests (slow!)
   %(prog)s --list                    # Show available test markers
         """
@@ -194,9 +203,16 @@ Examples:
                        help="Verbose output")
     parser.add_argument("--timeout", type=int, default=None,
                        help="Override default timeout (seconds)")
+    parser.add_argument("--parallel", nargs="?", const="auto", default=None,
+                       metavar="WORKERS",
+                       help="Run tests in parallel with pytest-xdist "
+                            "(default: one worker per CPU)")
     
     args = parser.parse_args()
     
+    global PARALLEL_WORKERS
+    PARALLEL_WORKERS = args.parallel
+    
     if args.list:
         list_test_markers()
         return 0
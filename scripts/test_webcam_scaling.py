@@ -11,7 +11,7 @@ from pathlib import Path
 # Add src to path to import modules
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-from cvkitworker.__main__ import create_webcam_config, create_file_config
+from cvkitworker.utils.config_utils import create_webcam_config, create_file_config
 from cvkitworker.detectors.frame_worker import FrameWorker
 import numpy as np
 
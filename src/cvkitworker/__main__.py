@@ -1,23 +1,23 @@
 import argparse
 import os
-import json
-import tempfile
 import signal
 import sys
 import atexit
 from cvkitworker.config.parse_config import ConfigParser
 from cvkitworker.detectors.frame_worker import FrameWorker
 from cvkitworker.detectors.detect_worker import DetectWorker
-from cvkitworker.utils.config_utils import create_file_config, create_webcam_config
-from concurrent.futures import ProcessPoolExecutor, TimeoutError
-from multiprocessing import Manager, shared_memory
+from cvkitworker.utils.config_utils import build_file_config, build_webcam_config
+from multiprocessing import Process, Queue, shared_memory
 from loguru import logger
 
 
+# Maximum number of frame messages waiting for a detect worker
+WORK_QUEUE_SIZE = 16
+
 # Global variables for graceful shutdown
 shutdown_requested = False
 cleanup_done = False
-executor = None
+producer = None
 frame_worker = None
 consumers = []
 shm = None
@@ -35,9 +35,60 @@ def signal_handler(signum, frame):
     cleanup_and_exit(0)
 
 
+def stop_workers():
+    """Stop worker processes that are still running and free shared memory.
+    
+    Safe to call more than once; each resource is released only once.
+    """
+    global producer, frame_worker, consumers, shm
+    
+    # Unload frame worker
+    if frame_worker is not None:
+        logger.info("Unloading frame worker...")
+        try:
+            frame_worker.unload()
+        except Exception as e:
+            logger.warning(f"Error unloading frame worker: {e}")
+        frame_worker = None
+    
+    # Stop worker processes that are still running: signal them all first so
+    # they shut down together, then kill any that ignore SIGTERM
+    logger.info(f"Stopping frame worker and {len(consumers)} detect workers...")
+    processes = [producer] + consumers
+    for i, process in enumerate(processes):
+        try:
+            if process is not None and process.is_alive():
+                process.terminate()
+        except Exception as e:
+            logger.warning(f"Error stopping worker process {i}: {e}")
+    for i, process in enumerate(processes):
+        try:
+            if process is None:
+                continue
+            process.join(timeout=1.0)
+            if process.is_alive():
+                logger.warning(f"Worker process {i} did not exit, killing it")
+                process.kill()
+                process.join()
+        except Exception as e:
+            logger.warning(f"Error stopping worker process {i}: {e}")
+    producer = None
+    consumers = []
+    
+    # Clean up shared memory
+    if shm is not None:
+        logger.info("Cleaning up shared memory...")
+        try:
+            shm.close()
+            shm.unlink()
+        except Exception as e:
+            logger.warning(f"Error cleaning up shared memory: {e}")
+        shm = None
+
+
 def cleanup_and_exit(exit_code=0):
     """Clean up resources and exit."""
-    global executor, frame_worker, consumers, shm, cleanup_done
+    global cleanup_done
     
     if cleanup_done:
         return  # Avoid double cleanup
@@ -46,37 +97,7 @@ def cleanup_and_exit(exit_code=0):
     logger.info("Starting cleanup process...")
     
     try:
-        # Shutdown the ProcessPoolExecutor
-        if executor is not None:
-            logger.info("Shutting down process executor...")
-            executor.shutdown(wait=False)
-            
-        # Unload frame worker
-        if frame_worker is not None:
-            logger.info("Unloading frame worker...")
-            try:
-                frame_worker.unload()
-            except Exception as e:
-                logger.warning(f"Error unloading frame worker: {e}")
-        
-        # Unload consumers
-        logger.info(f"Unloading {len(consumers)} detect workers...")
-        for i, consumer in enumerate(consumers):
-            try:
-                if hasattr(consumer, 'unload'):
-                    consumer.unload()
-            except Exception as e:
-                logger.warning(f"Error unloading consumer {i}: {e}")
-        
-        # Clean up shared memory
-        if shm is not None:
-            logger.info("Cleaning up shared memory...")
-            try:
-                shm.close()
-                shm.unlink()
-            except Exception as e:
-                logger.warning(f"Error cleaning up shared memory: {e}")
-                
+        stop_workers()
     except Exception as e:
         logger.error(f"Error during cleanup: {e}")
     
@@ -84,10 +105,103 @@ def cleanup_and_exit(exit_code=0):
     sys.exit(exit_code)
 
 
+def run_pipeline(config_parser, num_detect_workers=None, max_frames=None):
+    """Run the frame worker and detect workers until the source ends.
+    
+    Workers are stopped and shared memory is freed before returning.
+    
+    Args:
+        config_parser: ConfigParser holding the pipeline configuration
+        num_detect_workers: Detect workers to spawn; defaults to the config
+        max_frames: Stop the frame worker after this many frames
+    
+    Returns:
+        Exit code: 0 when the workers finished, 1 on error or when a worker
+        exited with a non-zero code
+    """
+    global producer, frame_worker, consumers, shm, shutdown_requested
+    
+    if num_detect_workers is None:
+        num_detect_workers = config_parser.get_workers_config()['detect_workers']
+
+    try:
+        # Enough slots that the producer never overwrites a slot that is
+        # still queued, being read by a detect worker or waiting for its
+        # batch to fill
+        config = config_parser.get_config()
+        slot_count = ((WORK_QUEUE_SIZE + num_detect_workers
+                       + len(config["detectors"]) + 1)
+                      * FrameWorker.batch_size(config))
+        # Without a resize step frames keep the receiver's native size,
+        # which may exceed the default bound (e.g. 4K sources)
+        source_shape = None
+        if not any(p["type"] == "resize" for p in config["preprocessors"]):
+            source_shape = FrameWorker.source_shape(config["receivers"])
+        # Each slot holds one frame at the size sent to the detectors
+        shm = shared_memory.SharedMemory(
+            create=True,
+            size=FrameWorker.slot_size(config, source_shape) * slot_count)
+        logger.info(f"Shared memory created with name {shm.name} and "
+                    f"size {shm.size}")
+        # A pipe-backed queue avoids proxying every message through a
+        # Manager server process; the endpoints are inherited by the
+        # worker processes when they start
+        work_queue = Queue(maxsize=WORK_QUEUE_SIZE)
+        frame_worker = FrameWorker(config, work_queue, shm.name, slot_count,
+                                   max_frames=max_frames)
 
-def main():
-    global executor, frame_worker, consumers, shm
+        logger.info(f"Spawning FrameWorker and {num_detect_workers} "
+                    f"DetectWorkers. PID: {os.getpid()}")
+        producer = Process(target=frame_worker.run, name="FrameWorker")
+        consumers = []
+        for i in range(num_detect_workers):
+            detect_worker = DetectWorker(work_queue, shm.name, slot_count,
+                                         worker_id=i,
+                                         worker_count=num_detect_workers,
+                                         detectors=config["detectors"])
+            consumers.append(Process(target=detect_worker.run,
+                                     name=f"DetectWorker-{i}"))
+
+        producer.start()
+        for consumer in consumers:
+            # Start multiple detect workers
+            consumer.start()
+
+        # Wait for the producer with timeout to allow interruption
+        try:
+            while not shutdown_requested:
+                producer.join(timeout=1.0)
+                if not producer.is_alive():
+                    break  # Producer finished normally
+
+            if not shutdown_requested:
+                # Wait for consumers to finish
+                for i, consumer in enumerate(consumers):
+                    consumer.join(timeout=5.0)
+                    if consumer.is_alive():
+                        logger.warning(f"Consumer {i} did not finish within timeout")
+
+        except KeyboardInterrupt:
+            logger.info("KeyboardInterrupt caught in main loop")
+            shutdown_requested = True
+
+        # Workers still running here are stopped below and not counted
+        failed = [p.name for p in [producer] + consumers
+                  if p.exitcode not in (None, 0)]
+
+    except Exception as e:
+        logger.error(f"Error in main execution: {e}")
+        return 1
+    finally:
+        stop_workers()
     
+    if failed:
+        logger.error(f"Workers exited with an error: {failed}")
+        return 1
+    return 0
+
+
+def main():
     logger.info(f"Main process started. PID: {os.getpid()}")
     
     # Register signal handlers for graceful shutdown
@@ -106,21 +220,18 @@ def main():
     args = parser.parse_args()
     
     # Determine configuration source
-    config_file = None
     if os.getenv("CVKIT_CONFIG") is not None:
-        config_file = os.getenv("CVKIT_CONFIG")
+        config_parser = ConfigParser(os.getenv("CVKIT_CONFIG"))
     elif args.config:
-        config_file = args.config
+        config_parser = ConfigParser(args.config)
     elif args.file:
-        # Create temporary config for file input
-        config_file = create_file_config(args.file)
+        # Build config for file input in memory
+        config_parser = ConfigParser(config=build_file_config(args.file))
     elif args.webcam:
-        # Create temporary config for webcam
-        config_file = create_webcam_config()
+        # Build config for webcam in memory
+        config_parser = ConfigParser(config=build_webcam_config())
     else:
         parser.error("Must specify --config, --file, or --webcam")
-
-    config_parser = ConfigParser(config_file)
     
     # Get worker configuration
     workers_config = config_parser.get_workers_config()
@@ -136,62 +247,11 @@ def main():
     
     logger.info(f"Using {num_detect_workers} detect workers")
 
-    try:
-        with Manager() as manager:
-            # Shared memory can be used to share data between processes
-            # TODO this is currently for one frame, we should make it the
-            # same size as the target frame
-            shm = shared_memory.SharedMemory(create=True,
-                                            size=1024 * 1024 * 1024)
-            logger.info(f"Shared memory created with name {shm.name} and "
-                       f"size {shm.size}")
-            work_queue = manager.Queue()
-            # TODO use multiprocessing.shared_memory to share the queue
-            # between processes
-            frame_worker = FrameWorker(config_parser.get_config(),
-                                      work_queue, shm.name)
-            consumers = []
-            
-            with ProcessPoolExecutor() as executor:
-                logger.info(f"Spawning FrameWorker and {num_detect_workers} "
-                           f"DetectWorkers. PID: {os.getpid()}")
-                producer = executor.submit(frame_worker.run)
-                
-                for i in range(num_detect_workers):
-                    detect_worker = DetectWorker(work_queue, shm.name)
-                    # Start multiple detect workers
-                    consumers.append(executor.submit(detect_worker.run))
-                
-                # Wait for the result with timeout to allow interruption
-                try:
-                    global shutdown_requested
-                    while not shutdown_requested:
-                        try:
-                            # Check producer with short timeout
-                            producer.result(timeout=1.0)
-                            break  # Producer finished normally
-                        except TimeoutError:
-                            continue  # Keep checking
-                        
-                    if not shutdown_requested:
-                        # Wait for consumers to finish
-                        for i, consumer in enumerate(consumers):
-                            try:
-                                consumer.result(timeout=5.0)
-                            except TimeoutError:
-                                logger.warning(f"Consumer {i} did not finish within timeout")
-                                
-                except KeyboardInterrupt:
-                    logger.info("KeyboardInterrupt caught in main loop")
-                    shutdown_requested = True
-                    
-    except Exception as e:
-        logger.error(f"Error in main execution: {e}")
-        cleanup_and_exit(1)
-        
+    exit_code = run_pipeline(config_parser, num_detect_workers)
+    
     # Normal cleanup (should also be called by atexit)
     logger.info("All workers finished. Performing cleanup...")
-    cleanup_and_exit(0)
+    cleanup_and_exit(exit_code)
 
 
 
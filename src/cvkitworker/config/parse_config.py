@@ -3,10 +3,22 @@ import os
 
 
 class ConfigParser:
-    def __init__(self, config_file):
+    def __init__(self, config_file=None, config=None):
+        """Load configuration from a JSON file or an in-memory dictionary.
+
+        When ``config`` is given it is used directly and no file is read.
+        CVKIT_WORKERS is read here, once, rather than on every
+        get_worker_count() call.
+        """
         self.config_file = config_file
+        self._env_workers = os.getenv('CVKIT_WORKERS')
         self.config = {}
-        self.parse_config()
+        if config is not None:
+            self.config = config
+        elif config_file is not None:
+            self.parse_config()
+        else:
+            raise ValueError("Either config_file or config must be provided")
 
     def parse_config(self):
         with open(self.config_file, 'r') as file:
@@ -32,20 +44,19 @@ class ConfigParser:
         """Get the number of detect workers to spawn.
         
         Priority order:
-        1. Environment variable CVKIT_WORKERS
+        1. Environment variable CVKIT_WORKERS, as set when the parser was created
         2. Config file workers.detect_workers
         3. Config file workers (for backward compatibility)
         4. Default: 2
         """
         # Check environment variable first
-        env_workers = os.getenv('CVKIT_WORKERS')
-        if env_workers:
-            try:
-                workers = int(env_workers)
-                if workers > 0:
-                    return workers
-            except ValueError:
-                pass
+        # Only plain digits can be a positive count, so anything else falls
+        # through without raising and catching a ValueError
+        env_workers = self._env_workers
+        if env_workers and env_workers.strip().isdecimal():
+            workers = int(env_workers)
+            if workers > 0:
+                return workers
         
         # Check config file
         workers_config = self.get('workers', {})
@@ -1,25 +1,80 @@
 from multiprocessing import shared_memory
 import time
 import os
+import select
 import signal
 
 import cv2
-import numpy as np
-from .detectors.face_detect import FaceDetector
-from .frame import Frame
+from .loader import DetectorLoader
+from ..ipc.frame_header import DETECTOR_TYPES, read_frame
+from ..utils.cpu import configure_worker_cpus
+from ..utils.timing import flush_timing
 from loguru import logger
 
 
 class DetectWorker:
-    def __init__(self, queue, shared_memory_name):
+    def __init__(self, queue, shared_memory_name, slot_count=1,
+                 worker_id=None, worker_count=1, detectors=None):
         self.queue = queue
+        # Detector configs the models are built from in load()
+        self.detectors = detectors or []
         self.shared_memory_name = shared_memory_name
+        self.slot_count = slot_count
+        # Used to split the CPUs between detect workers
+        self.worker_id = worker_id
+        self.worker_count = worker_count
         self.face_detector = None
         self.shutdown_requested = False
+        self._shm = None
+        self._slot_size = None
+        self._pid = None
+        # Show frames in a HighGUI window; off for headless deployments
+        self.display = os.getenv('CVKIT_DISPLAY', '').lower() in ('true', '1', 'yes')
+        self._wakeup_r = None
+        self._wakeup_w = None
+    
+    def _install_signal_handlers(self):
+        """Register shutdown handlers in the process that executes run().
         
-        # Register signal handler for this worker
+        The worker object is pickled into the child process, so handlers
+        registered in __init__ would only apply to the parent. A wakeup pipe
+        lets the idle wait return as soon as a signal arrives.
+        """
         signal.signal(signal.SIGINT, self._signal_handler)
         signal.signal(signal.SIGTERM, self._signal_handler)
+        try:
+            self._wakeup_r, self._wakeup_w = os.pipe()
+            os.set_blocking(self._wakeup_w, False)
+            signal.set_wakeup_fd(self._wakeup_w)
+        except (OSError, ValueError) as e:
+            # set_wakeup_fd is only allowed from the main thread
+            logger.debug(f"Signal wakeup fd not available: {e}")
+            self._close_wakeup_fd()
+    
+    def _close_wakeup_fd(self):
+        """Detach and close the signal wakeup pipe if one was created."""
+        if self._wakeup_w is not None:
+            try:
+                signal.set_wakeup_fd(-1)
+            except ValueError:
+                pass
+        for fd in (self._wakeup_r, self._wakeup_w):
+            if fd is not None:
+                os.close(fd)
+        self._wakeup_r = None
+        self._wakeup_w = None
+    
+    def _wait_for_work(self, timeout):
+        """Sleep until the timeout expires or a signal is delivered."""
+        if self._wakeup_r is None:
+            time.sleep(timeout)
+            return
+        ready, _, _ = select.select([self._wakeup_r], [], [], timeout)
+        if ready:
+            try:
+                os.read(self._wakeup_r, 512)
+            except BlockingIOError:
+                pass
     
     def _signal_handler(self, signum, frame):
         """Handle shutdown signals in worker process."""
@@ -27,15 +82,28 @@ class DetectWorker:
         self.shutdown_requested = True
 
     def load(self):
-        # Load any necessary configuration for the detection worker
-        # This could include loading models, setting up logging, etc.
-        # This needs to dynamically load the various detectors based on
-        # the configuration
-        self.face_detector = FaceDetector("dlib")  # Use basic dlib detector as default
+        # Models are built from the detector configs in the worker process,
+        # so each worker gets its own detector instance
+        if self.shutdown_requested:
+            return
+        # Attach once; every frame is read from a slot of the same block
+        self._shm = shared_memory.SharedMemory(name=self.shared_memory_name)
+        self._slot_size = self._shm.size // self.slot_count
+        loader = DetectorLoader(self.detectors, self.worker_count)
+        loader.load_model()
+        self.face_detector = loader.model
+        if self.face_detector is None:
+            raise ValueError("No face_detector configured for DetectWorker")
+        # Indexed by the detector_id packed in each frame header
+        self._dispatch = (self.face_detector.detect,)
+        self._dispatch_batch = (self.face_detector.detect_batch,)
         logger.info(f"Loaded configuration for DetectWorker. PID: "
                     f"{os.getpid()}")
 
     def run(self):
+        self._pid = os.getpid()
+        self._install_signal_handlers()
+        configure_worker_cpus(self.worker_id, self.worker_count)
         self.load()
         logger.info(f"DetectWorker started, waiting for items in the "
                     f"queue... PID: {os.getpid()}")
@@ -50,39 +118,22 @@ class DetectWorker:
                         logger.info(f"DetectWorker PID {os.getpid()} received STOP signal")
                         break
                         
-                    if isinstance(frame_data, Frame):
-                        logger.info(f"{os.getpid()} Processing item from queue: "
-                                    f"{frame_data.detector}")
-                        # Get the frame from shared memory
-                        shm = shared_memory.SharedMemory(name=self.shared_memory_name)
-                        frame = np.ndarray(frame_data.shape,
-                                           dtype=frame_data.frame_type,
-                                           buffer=shm.buf)
-                        logger.info(f"Frame shape: {frame.shape}, type: {frame.dtype}")
-                        # Convert the frame to Grayscale if needed
-                        # if frame_data.frame_type == "uint8":
-                        #    frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                        # Use opencv to show the frame
-                        cv2.imshow(f"{os.getpid()} Frame", frame)
-                        # cv2.waitKey(1)
-                        match frame_data.detector:
-                            case "face_detector":
-                                faces = self.face_detector.detect(frame)
-                                # Replace None with the actual frame
-                                logger.info(f"Detected faces: {len(faces)}. PID: "
-                                            f"{os.getpid()}")
+                    if isinstance(frame_data, (int, tuple)):
+                        if isinstance(frame_data, int):
+                            self._process_slot(frame_data)
+                        else:
+                            self._process_batch(frame_data)
                         
                         # Check for shutdown after processing
                         if self.shutdown_requested:
                             break
                             
-                    key = cv2.waitKey(1) & 0xFF
-                    if key == ord('q'):
+                    if self.display and cv2.waitKey(1) & 0xFF == ord('q'):
                         logger.info(f"DetectWorker PID {os.getpid()} received "
                                     f"'q' key press.")
                         break
                 else:
-                    time.sleep(0.1)
+                    self._wait_for_work(0.1)
                     
             except Exception as e:
                 logger.error(f"Error in DetectWorker: {e}")
@@ -92,9 +143,49 @@ class DetectWorker:
         logger.info(f"DetectWorker PID {os.getpid()} exiting")
         self.unload()
     
+    def _process_slot(self, slot):
+        """Run the detector named in a slot's header on its frame.
+        
+        The frame is a view into shared memory, so it must not outlive this
+        call or the block could not be closed on unload.
+        """
+        det_id, frame, seq, timestamp = read_frame(
+            self._shm.buf, slot * self._slot_size)
+        logger.trace("{} Processing item from queue: {} {} {}", self._pid,
+                     DETECTOR_TYPES[det_id], frame.shape, frame.dtype)
+        if self.display:
+            cv2.imshow(f"{self._pid} Frame", frame)
+        faces = self._dispatch[det_id](frame)
+        logger.trace("Detected faces: {}. PID: {}", len(faces), self._pid)
+    
+    def _process_batch(self, slots):
+        """Run one detector over the frames in a batch of slots.
+        
+        All slots in a batch were written for the same detector, so the
+        first header selects it.
+        """
+        frames = []
+        for slot in slots:
+            det_id, frame, seq, timestamp = read_frame(
+                self._shm.buf, slot * self._slot_size)
+            frames.append(frame)
+        logger.trace("{} Processing batch of {} from queue: {}", self._pid,
+                     len(frames), DETECTOR_TYPES[det_id])
+        results = self._dispatch_batch[det_id](frames)
+        logger.opt(lazy=True).trace(
+            "Detected faces: {} in {} frames. PID: {}",
+            lambda: sum(len(f) for f in results), lambda: len(frames),
+            lambda: self._pid)
+    
     def unload(self):
         """Clean up resources."""
-        try:
-            cv2.destroyAllWindows()
-        except Exception as e:
-            logger.warning(f"Error closing OpenCV windows: {e}")
+        flush_timing()
+        self._close_wakeup_fd()
+        if self._shm is not None:
+            self._shm.close()
+            self._shm = None
+        if self.display:
+            try:
+                cv2.destroyAllWindows()
+            except Exception as e:
+                logger.warning(f"Error closing OpenCV windows: {e}")
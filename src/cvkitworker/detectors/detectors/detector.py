@@ -2,6 +2,11 @@ class Detector:
     def __init__(self):
         pass
 
+    @classmethod
+    def accepts_grayscale(cls, variant=None):
+        """Whether the detector works on single channel frames."""
+        return False
+
     def detect(self, frame):
         # Implement detection logic here
         pass
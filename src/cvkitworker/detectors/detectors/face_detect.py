@@ -1,6 +1,8 @@
 from .detector import Detector
 import os
+import platform
 import time
+from enum import IntEnum
 import cv2
 import numpy as np
 from pathlib import Path
@@ -13,15 +15,64 @@ from ...utils.timing import (
 )
 
 
+class DetectorKind(IntEnum):
+    """Face detector variants, resolved once so detect() compares ints."""
+    DLIB = 0
+    DLIB_CNN = 1
+    OPENCV_DNN = 2
+    YUNET = 3
+    COREML = 4
+    # Reports no faces; exercises the pipeline without loading a model
+    NOOP = 5
+
+
+# Variants that can run directly on grayscale frames
+GRAYSCALE_KINDS = (DetectorKind.DLIB, DetectorKind.DLIB_CNN, DetectorKind.NOOP)
+
+# Smallest face (px) the dlib HOG and CNN detectors find without upsampling
+DLIB_MIN_FACE_PX = {DetectorKind.DLIB: 80, DetectorKind.DLIB_CNN: 40}
+
+# Max differing dHash bits for two frames to count as the same scene
+CACHE_HASH_THRESHOLD = 5
+# Frames served from the cache before detection is forced to run again
+CACHE_MAX_HITS = 30
+
+
 class FaceDetector(Detector):
-    def __init__(self, detector_name: str, model_path: str = None, device: str = "cpu"):
+    def __init__(self, detector_name: str, model_path: str = None, device: str = "cpu",
+                 cache: bool = False, min_face_px: int = None,
+                 worker_count: int = 1):
         self.detector_name = detector_name
         self.model_path = model_path
         self.device = device
+        # Detect workers sharing the machine, used to split ONNX threads
+        self.worker_count = max(1, worker_count)
+        # Smallest face worth finding; lets dlib run on a shrunken frame
+        self.min_face_px = min_face_px
+        self._dlib_scale = 1.0
+        # Reuse the last result while the scene is unchanged
+        self.cache = cache
+        self._last_hash = None
+        self._last_faces = None
+        self._cache_hits = 0
         self.detector_lib = None
+        self._kind = None
+        # ONNX Runtime session used instead of cv2.dnn for .onnx SSD models
+        self._session = None
+        self._input_name = None
+        # YuNet input size last set, so it is only reset when frames change
+        self._yunet_size = None
+        # Color conversion outputs keyed by conversion code, reused per frame
+        self._color_buffers = {}
         self.models_dir = Path("models")
         self.load()
 
+    @classmethod
+    def accepts_grayscale(cls, variant=None):
+        """Whether the variant works on single channel frames."""
+        kind = DetectorKind.__members__.get((variant or "dlib").upper())
+        return kind in GRAYSCALE_KINDS
+
     def _find_model_file(self, filename: str):
         """Find model file in models directory or download if needed."""
         model_file = self.models_dir / filename
@@ -55,12 +106,24 @@ class FaceDetector(Detector):
     def load(self):
         logger.info(f"Loading {self.detector_name} face detector on {self.device}. PID: {os.getpid()}")
         
-        if self.detector_name == "dlib":
+        try:
+            self._kind = DetectorKind[self.detector_name.upper()]
+        except KeyError:
+            logger.error(f"Unknown detector: {self.detector_name}. PID: {os.getpid()}")
+            raise ValueError(f"Unknown detector: {self.detector_name}. "
+                           f"Supported: dlib, dlib_cnn, opencv_dnn, yunet, coreml, noop")
+        
+        if self._kind in DLIB_MIN_FACE_PX and self.min_face_px:
+            # Shrink frames so min_face_px faces land at dlib's smallest
+            # window, skipping the pyramid levels for faces that small
+            self._dlib_scale = min(1.0, DLIB_MIN_FACE_PX[self._kind] / self.min_face_px)
+        
+        if self._kind == DetectorKind.DLIB:
             import dlib
             self.detector_lib = dlib.get_frontal_face_detector()
             logger.info(f"Loaded dlib frontal face detector. PID: {os.getpid()}")
             
-        elif self.detector_name == "dlib_cnn":
+        elif self._kind == DetectorKind.DLIB_CNN:
             import dlib
             
             # Use provided model path or find default
@@ -69,10 +132,13 @@ class FaceDetector(Detector):
             else:
                 model_file = self._find_model_file("mmod_human_face_detector.dat")
             
+            if dlib.DLIB_USE_CUDA:
+                # Bind the device once here rather than on the first detect
+                dlib.cuda.set_device(0)
             self.detector_lib = dlib.cnn_face_detection_model_v1(model_file)
             logger.info(f"Loaded dlib CNN face detector from {model_file}. PID: {os.getpid()}")
             
-        elif self.detector_name == "opencv_dnn":
+        elif self._kind == DetectorKind.OPENCV_DNN:
             # Use provided model path or find default
             if self.model_path and os.path.exists(self.model_path):
                 model_file = self.model_path
@@ -81,123 +147,318 @@ class FaceDetector(Detector):
                 model_file = self._find_model_file("opencv_face_detector_uint8.pb")
                 config_file = self._find_model_file("opencv_face_detector.pbtxt")
             
-            self.detector_lib = cv2.dnn.readNetFromTensorflow(model_file, config_file)
-            logger.info(f"Loaded OpenCV DNN face detector from {model_file}. PID: {os.getpid()}")
+            if model_file.endswith('.onnx'):
+                self._load_onnx_session(model_file)
+                logger.info(f"Loaded ONNX Runtime face detector from {model_file}. PID: {os.getpid()}")
+            else:
+                self.detector_lib = cv2.dnn.readNetFromTensorflow(model_file, config_file)
+                backend_id, target_id = self._dnn_backend()
+                self.detector_lib.setPreferableBackend(backend_id)
+                self.detector_lib.setPreferableTarget(target_id)
+                logger.info(f"Loaded OpenCV DNN face detector from {model_file}. PID: {os.getpid()}")
             
-        elif self.detector_name == "yunet":
+        elif self._kind == DetectorKind.YUNET:
             # Use provided model path or find default
             if self.model_path and os.path.exists(self.model_path):
                 model_file = self.model_path
             else:
                 model_file = self._find_model_file("face_detection_yunet_2023mar.onnx")
             
+            backend_id, target_id = self._dnn_backend()
             self.detector_lib = cv2.FaceDetectorYN.create(
                 model=model_file,
                 config="",
                 input_size=(640, 480),
                 score_threshold=0.6,
                 nms_threshold=0.3,
-                top_k=5000
+                top_k=5000,
+                backend_id=backend_id,
+                target_id=target_id
             )
+            self._yunet_size = (640, 480)
             logger.info(f"Loaded YuNet face detector from {model_file}. PID: {os.getpid()}")
             
-        else:
-            logger.error(f"Unknown detector: {self.detector_name}. PID: {os.getpid()}")
-            raise ValueError(f"Unknown detector: {self.detector_name}. "
-                           f"Supported: dlib, dlib_cnn, opencv_dnn, yunet")
+        elif self._kind == DetectorKind.COREML:
+            # SSD face detector converted offline to a Core ML package, run on
+            # the Neural Engine, GPU and CPU as Core ML sees fit
+            if platform.system() != "Darwin":
+                raise ValueError("The coreml face detector is only available on macOS")
+            if not self.model_path or not os.path.exists(self.model_path):
+                raise FileNotFoundError(f"Core ML model not found: {self.model_path}. "
+                                        f"Set model_path to a converted .mlpackage")
+            try:
+                import coremltools as ct
+            except ImportError:
+                raise ImportError("coremltools is required for the coreml detector. "
+                                  "Install with: pip install coremltools")
+            
+            self.detector_lib = ct.models.MLModel(self.model_path,
+                                                  compute_units=ct.ComputeUnit.ALL)
+            self._input_name = self.detector_lib.get_spec().description.input[0].name
+            logger.info(f"Loaded Core ML face detector from {self.model_path}. PID: {os.getpid()}")
+            
+        elif self._kind == DetectorKind.NOOP:
+            logger.info(f"Loaded noop face detector, no faces will be reported. PID: {os.getpid()}")
+
+    def _dnn_backend(self):
+        """Return the cv2.dnn (backend, target) pair for the configured device.
+        
+        ``cuda`` and ``opencl`` fall back to the CPU when OpenCV was built
+        without that support or no device is present; ``auto`` tries CUDA,
+        then OpenCL, then the CPU.
+        """
+        device = (self.device or "cpu").lower()
+        
+        if device in ("cuda", "auto"):
+            if cv2.cuda.getCudaEnabledDeviceCount() > 0:
+                return cv2.dnn.DNN_BACKEND_CUDA, cv2.dnn.DNN_TARGET_CUDA_FP16
+            if device == "cuda":
+                logger.warning(f"No CUDA device available to OpenCV, using CPU. PID: {os.getpid()}")
+        
+        if device in ("opencl", "auto"):
+            if cv2.ocl.haveOpenCL():
+                return cv2.dnn.DNN_BACKEND_OPENCV, cv2.dnn.DNN_TARGET_OPENCL_FP16
+            if device == "opencl":
+                logger.warning(f"OpenCL not available to OpenCV, using CPU. PID: {os.getpid()}")
+        
+        return cv2.dnn.DNN_BACKEND_OPENCV, cv2.dnn.DNN_TARGET_CPU
+
+    def _load_onnx_session(self, model_file):
+        """Create an ONNX Runtime session for an SSD face model.
+        
+        Intended for INT8 quantized exports of the OpenCV SSD detector, which
+        produce the same [1, 1, N, 7] detections as cv2.dnn. Intra-op threads
+        are split between detect workers so they do not oversubscribe cores.
+        A ``cuda`` or ``auto`` device runs on the CUDA execution provider when
+        the installed onnxruntime has one.
+        """
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            raise ImportError("onnxruntime is required for .onnx opencv_dnn "
+                              "models. Install with: pip install onnxruntime")
+        
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = max(1, (os.cpu_count() or 1) // self.worker_count)
+        
+        providers = ['CPUExecutionProvider']
+        device = (self.device or "cpu").lower()
+        if device in ("cuda", "auto"):
+            if 'CUDAExecutionProvider' in ort.get_available_providers():
+                providers.insert(0, 'CUDAExecutionProvider')
+            elif device == "cuda":
+                logger.warning(f"No CUDA provider in onnxruntime, using CPU. PID: {os.getpid()}")
+        
+        self._session = ort.InferenceSession(
+            model_file, sess_options=options, providers=providers)
+        self._input_name = self._session.get_inputs()[0].name
 
     @measure_face_detection
     def detect(self, frame):
         """Detect faces in frame and return consistent format."""
-        logger.debug(f"Detecting faces using {self.detector_name} detector. PID: {os.getpid()}")
+        return self._detect(frame)
+
+    def _detect(self, frame):
+        """Untimed detect(), for callers that record their own timing."""
+        if self.cache:
+            frame_hash = self._frame_hash(frame)
+            if (self._last_hash is not None
+                    and self._cache_hits < CACHE_MAX_HITS
+                    and (frame_hash ^ self._last_hash).bit_count() < CACHE_HASH_THRESHOLD):
+                self._cache_hits += 1
+                return list(self._last_faces)
+        
+        logger.trace("Detecting faces using {} detector. PID: {}", self.detector_name, os.getpid())
         
         faces = []
         
         try:
-            if self.detector_name == "dlib":
-                # Convert BGR to RGB for dlib
-                rgb_frame = self._convert_color(frame, cv2.COLOR_BGR2RGB)
-                detections = self.detector_lib(rgb_frame, 0)
+            kind = self._kind
+            if kind == DetectorKind.DLIB:
+                detections = self.detector_lib(self._dlib_input(frame), 0)
                 
+                scale = 1.0 / self._dlib_scale
                 for detection in detections:
                     faces.append({
-                        'x': detection.left(),
-                        'y': detection.top(),
-                        'width': detection.width(),
-                        'height': detection.height(),
+                        'x': round(detection.left() * scale),
+                        'y': round(detection.top() * scale),
+                        'width': round(detection.width() * scale),
+                        'height': round(detection.height() * scale),
                         'confidence': 1.0  # dlib doesn't provide confidence
                     })
                     
-            elif self.detector_name == "dlib_cnn":
-                # Convert BGR to RGB for dlib
-                rgb_frame = self._convert_color(frame, cv2.COLOR_BGR2RGB)
-                detections = self.detector_lib(rgb_frame, 0)
-                
-                for detection in detections:
-                    rect = detection.rect
-                    faces.append({
-                        'x': rect.left(),
-                        'y': rect.top(),
-                        'width': rect.width(),
-                        'height': rect.height(),
-                        'confidence': detection.confidence
-                    })
+            elif kind == DetectorKind.DLIB_CNN:
+                faces = self._cnn_faces(self.detector_lib(self._dlib_input(frame), 0))
                     
-            elif self.detector_name == "opencv_dnn":
+            elif kind == DetectorKind.OPENCV_DNN:
                 height, width = frame.shape[:2]
                 
                 # Create blob from frame
                 blob = self._create_dnn_blob(frame)
-                self.detector_lib.setInput(blob)
-                detections = self.detector_lib.forward()
+                if self._session is not None:
+                    detections = self._session.run(
+                        None, {self._input_name: blob})[0]
+                else:
+                    self.detector_lib.setInput(blob)
+                    detections = self.detector_lib.forward()
                 
-                for i in range(detections.shape[2]):
-                    confidence = detections[0, 0, i, 2]
-                    
-                    if confidence > 0.5:  # Confidence threshold
-                        x1 = int(detections[0, 0, i, 3] * width)
-                        y1 = int(detections[0, 0, i, 4] * height)
-                        x2 = int(detections[0, 0, i, 5] * width)
-                        y2 = int(detections[0, 0, i, 6] * height)
+                faces = self._ssd_faces(detections[0, 0], width, height)
                         
-                        faces.append({
-                            'x': x1,
-                            'y': y1,
-                            'width': x2 - x1,
-                            'height': y2 - y1,
-                            'confidence': float(confidence)
-                        })
+            elif kind == DetectorKind.COREML:
+                height, width = frame.shape[:2]
+                
+                blob = self._create_dnn_blob(frame)
+                outputs = self.detector_lib.predict({self._input_name: blob})
+                # Same [1, 1, N, 7] layout as the cv2.dnn SSD output
+                detections = next(iter(outputs.values()))
+                faces = self._ssd_faces(detections.reshape(-1, 7), width, height)
                         
-            elif self.detector_name == "yunet":
+            elif kind == DetectorKind.YUNET:
                 height, width = frame.shape[:2]
-                self.detector_lib.setInputSize((width, height))
+                if (width, height) != self._yunet_size:
+                    # Reallocates YuNet's tensors, so only on a size change
+                    self.detector_lib.setInputSize((width, height))
+                    self._yunet_size = (width, height)
                 
                 _, detections = self.detector_lib.detect(frame)
                 
                 if detections is not None:
-                    for detection in detections:
-                        x, y, w, h = detection[:4].astype(int)
-                        confidence = detection[14]
-                        
-                        faces.append({
-                            'x': x,
-                            'y': y,
-                            'width': w,
-                            'height': h,
-                            'confidence': float(confidence)
-                        })
+                    boxes = detections[:, :4].astype(np.int32)
+                    faces = [{
+                        'x': x,
+                        'y': y,
+                        'width': w,
+                        'height': h,
+                        'confidence': confidence
+                    } for (x, y, w, h), confidence in zip(boxes.tolist(), detections[:, 14].tolist())]
                         
         except Exception as e:
             logger.error(f"Error during face detection: {e}")
+            # Never cache a failed detection as "no faces"
+            return faces
             
-        logger.info(f"Found {len(faces)} faces using {self.detector_name}. PID: {os.getpid()}")
+        logger.trace("Found {} faces using {}. PID: {}", len(faces), self.detector_name, os.getpid())
         
+        if self.cache:
+            self._last_hash = frame_hash
+            self._last_faces = faces
+            self._cache_hits = 0
         return faces
 
+    @measure_face_detection
+    def detect_batch(self, frames):
+        """Detect faces in several frames, returning one face list per frame.
+        
+        opencv_dnn runs a single forward pass over a blob of all frames and
+        dlib_cnn a single batched call when the frames share a size; the
+        other variants, and ONNX Runtime models whose batch size may be
+        fixed, fall back to detect() per frame. The batch is timed as one
+        face_detection measurement.
+        """
+        if self._kind == DetectorKind.DLIB_CNN and len({f.shape for f in frames}) == 1:
+            return self._detect_batch_cnn(frames)
+        if self._kind != DetectorKind.OPENCV_DNN or self._session is not None:
+            return [self._detect(frame) for frame in frames]
+        
+        try:
+            blob = cv2.dnn.blobFromImages(frames, 1.0, (300, 300), [104, 117, 123])
+            self.detector_lib.setInput(blob)
+            rows = self.detector_lib.forward()[0, 0]
+        except Exception as e:
+            logger.error(f"Error during batched face detection: {e}")
+            return [[] for _ in frames]
+        
+        # Column 0 of each SSD row is the index of the image in the batch
+        results = []
+        for index, frame in enumerate(frames):
+            height, width = frame.shape[:2]
+            results.append(self._ssd_faces(rows[rows[:, 0] == index], width, height))
+        logger.opt(lazy=True).trace(
+            "Found {} faces in {} frames using {}. PID: {}",
+            lambda: sum(len(f) for f in results), lambda: len(frames),
+            lambda: self.detector_name, os.getpid)
+        return results
+
+    def _detect_batch_cnn(self, frames):
+        """Run the dlib CNN detector over equally sized frames in one call."""
+        try:
+            # _dlib_input may hand back its reused color buffer, so copy
+            images = [np.array(self._dlib_input(frame)) for frame in frames]
+            batches = self.detector_lib(images, 0)
+        except Exception as e:
+            logger.error(f"Error during batched face detection: {e}")
+            return [[] for _ in frames]
+        
+        results = [self._cnn_faces(detections) for detections in batches]
+        logger.opt(lazy=True).trace(
+            "Found {} faces in {} frames using {}. PID: {}",
+            lambda: sum(len(f) for f in results), lambda: len(frames),
+            lambda: self.detector_name, os.getpid)
+        return results
+
+    def _cnn_faces(self, detections):
+        """Convert dlib MMOD detections to face dicts in full-size pixels."""
+        scale = 1.0 / self._dlib_scale
+        return [{
+            'x': round(detection.rect.left() * scale),
+            'y': round(detection.rect.top() * scale),
+            'width': round(detection.rect.width() * scale),
+            'height': round(detection.rect.height() * scale),
+            'confidence': detection.confidence
+        } for detection in detections]
+
+    def _ssd_faces(self, rows, width, height):
+        """Convert SSD detection rows to face dicts, all rows at once."""
+        rows = rows[rows[:, 2] > 0.5]  # Confidence threshold
+        boxes = (rows[:, 3:7] * np.array([width, height, width, height])).astype(np.int32)
+        return [{
+            'x': x1,
+            'y': y1,
+            'width': x2 - x1,
+            'height': y2 - y1,
+            'confidence': confidence
+        } for (x1, y1, x2, y2), confidence in zip(boxes.tolist(), rows[:, 2].tolist())]
+
+    def _dlib_input(self, frame):
+        """Shrink by the min_face_px scale, then convert color for dlib.
+        
+        Shrinking first means the color conversion touches fewer pixels.
+        dlib takes grayscale as is; color must be RGB.
+        """
+        if self._dlib_scale < 1.0:
+            frame = self._resize(frame, self._dlib_scale)
+        if frame.ndim == 2:
+            return frame
+        return self._convert_color(frame, cv2.COLOR_BGR2RGB)
+
+    @measure_scaling
+    def _resize(self, frame, scale):
+        """Scale a frame down with timing measurement."""
+        height, width = frame.shape[:2]
+        return cv2.resize(frame, (max(1, int(width * scale)), max(1, int(height * scale))),
+                          interpolation=cv2.INTER_AREA)
+
+    @staticmethod
+    def _frame_hash(frame):
+        """Return a 64-bit difference hash (dHash) of a frame."""
+        small = cv2.resize(frame, (9, 8), interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        bits = small[:, 1:] > small[:, :-1]
+        return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
     @measure_color_conversion 
     def _convert_color(self, frame, conversion_code):
-        """Convert color space with timing measurement."""
-        return cv2.cvtColor(frame, conversion_code)
+        """Convert color space with timing measurement.
+        
+        The output is written into the buffer from the previous call when
+        the shape still matches; OpenCV allocates a new one otherwise.
+        """
+        dst = cv2.cvtColor(frame, conversion_code,
+                           dst=self._color_buffers.get(conversion_code))
+        self._color_buffers[conversion_code] = dst
+        return dst
     
     @measure_image_processing
     def _create_dnn_blob(self, frame):
@@ -3,37 +3,170 @@ import cv2
 import time
 import os
 import signal
+import queue
+from functools import partial
 import numpy as np
 from loguru import logger
 
-from .loader import DetectorLoader
+from .loader import DetectorLoader, accepts_grayscale
 from cvkitworker.receivers.loader import ReceiverLoader
-from .frame import Frame
-from ..utils.timing import measure_frame_processing
-from ..preprocessors.image_processing import resize_frame, convert_to_grayscale
+from ..ipc.frame_header import (
+    PAYLOAD_OFFSET, detector_id, payload_view, write_header
+)
+from ..utils.timing import flush_timing, measure_frame_processing
+from ..preprocessors.image_processing import (
+    resize_frame, convert_to_grayscale, target_size
+)
+
+
+# Frame bound used for slot sizing when no resize preprocessor fixes the size
+DEFAULT_MAX_FRAME_SHAPE = (1080, 1920, 3)
+# Bound on height/width when the resize preprocessor fixes only one side
+MAX_ASPECT_RATIO = 16 / 9
 
 
 class FrameWorker:
-    def __init__(self, config, queue, shared_memory_name):
+    def __init__(self, config, queue, shared_memory_name, slot_count=1,
+                 max_frames=None):
         self.receiver_config = config["receivers"]
         self.detectors = config["detectors"]
-        self.preprocessors = config["preprocessors"]
+        self.preprocessors = self._compatible_preprocessors(
+            config["preprocessors"], self.detectors)
         self.shared_memory_name = shared_memory_name
+        # Shared memory is split into slot_count equally sized slots, each
+        # holding a packed frame header followed by the pixel data
+        self.slot_count = slot_count
+        self._seq = 0
+        self._shm = None
+        self._slot_size = None
+        # Payload views keyed by (slot, shape, dtype), reused across frames
+        self._views = {}
+        # Run preprocessing through OpenCL (T-API) when enabled in load()
+        self._use_umat = False
         self.video_capture = None
         self.receiver = None
         self.queue = queue
+        # Stop after grabbing this many frames; None runs to the end
+        self.max_frames = max_frames
         self.shutdown_requested = False
+    
+    @staticmethod
+    def slot_size(config, source_shape=None):
+        """Return the shared memory bytes needed per slot for a config.
+        
+        The bound is derived from the resize preprocessor and the largest
+        detector scale, so the shared block is sized for the frames actually
+        sent to detect workers rather than the native capture resolution.
+        Without a resize step the frames keep the receiver's size, given as
+        source_shape, or DEFAULT_MAX_FRAME_SHAPE when it is unknown.
+        """
+        height, width, channels = source_shape or DEFAULT_MAX_FRAME_SHAPE
+        for preprocessor in config.get("preprocessors", []):
+            if preprocessor["type"] != "resize":
+                continue
+            resize_width = preprocessor.get("width")
+            resize_height = preprocessor.get("height")
+            if resize_width is not None and resize_height is not None:
+                width, height = int(resize_width), int(resize_height)
+            elif resize_width is not None:
+                width = int(resize_width)
+                height = int(width * MAX_ASPECT_RATIO)
+            elif resize_height is not None:
+                height = int(resize_height)
+                width = int(height * MAX_ASPECT_RATIO)
+        
+        scale = max([float(d.get("scale", 1.0)) for d in config.get("detectors", [])]
+                    + [1.0])
+        height, width = int(height * scale), int(width * scale)
+        return PAYLOAD_OFFSET + height * width * channels
+
+    @staticmethod
+    def source_shape(receivers):
+        """Return the (height, width, channels) of the receiver's frames.
+        
+        Read from the capture properties, or from the first frame when the
+        backend does not report them. Returns None when the source cannot
+        be opened or read.
+        """
+        try:
+            capture = ReceiverLoader(receivers).get_video_capture()
+        except (OSError, RuntimeError, ValueError) as e:
+            logger.warning(f"Could not open receiver to size frames: {e}")
+            return None
+        try:
+            if not capture.isOpened():
+                return None
+            width = int(capture.get(cv2.CAP_PROP_FRAME_WIDTH))
+            height = int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            if not (width and height):
+                ret, frame = capture.read()
+                if not ret:
+                    return None
+                height, width = frame.shape[:2]
+            # Captures deliver BGR frames
+            return height, width, 3
+        finally:
+            capture.release()
+
+    @staticmethod
+    def _compatible_preprocessors(preprocessors, detectors):
+        """Drop a grayscale step that a configured detector cannot use.
+        
+        The frame is shared by every detector, so a detector that needs
+        color would otherwise have to convert it back (or fail), paying
+        for two full-frame conversions that cancel out.
+        """
+        color_detectors = [d.get("name", d["type"]) for d in detectors
+                           if not accepts_grayscale(d)]
+        if not color_detectors:
+            return preprocessors
+        kept = [p for p in preprocessors if p["type"] != "grayscale"]
+        if len(kept) != len(preprocessors):
+            logger.warning(f"Skipping grayscale preprocessing, detectors "
+                           f"{color_detectors} need color frames")
+        return kept
+
+    @staticmethod
+    def batch_size(config):
+        """Return the largest batch_size of any detector in a config."""
+        return max([int(d.get("batch_size", 1)) for d in config.get("detectors", [])]
+                   + [1])
+
+    def _install_signal_handlers(self):
+        """Register shutdown handlers in the process that executes run().
         
-        # Register signal handler for this worker
+        Registering them in __init__ would rebind the parent's SIGINT and
+        SIGTERM to this worker, which only exists there to be pickled.
+        """
         signal.signal(signal.SIGINT, self._signal_handler)
         signal.signal(signal.SIGTERM, self._signal_handler)
-    
+
     def _signal_handler(self, signum, frame):
         """Handle shutdown signals in worker process."""
         logger.info(f"FrameWorker received signal {signum}. Requesting shutdown...")
         self.shutdown_requested = True
 
+    def _attach_shared_memory(self):
+        """Attach to the shared block once for the life of the worker."""
+        self._shm = shared_memory.SharedMemory(name=self.shared_memory_name)
+        self._slot_size = self._shm.size // self.slot_count
+        self._views = {}
+
+    def _close_shared_memory(self):
+        """Drop cached views and detach from the shared block."""
+        # Views export the buffer, so they must go before close()
+        self._views.clear()
+        if self._shm is not None:
+            self._shm.close()
+            self._shm = None
+
     def load(self):
+        self._attach_shared_memory()
+        if os.getenv('CVKIT_OPENCL', '').lower() in ('true', '1', 'yes'):
+            self._use_umat = cv2.ocl.haveOpenCL()
+            cv2.ocl.setUseOpenCL(self._use_umat)
+            if not self._use_umat:
+                logger.warning("CVKIT_OPENCL set but OpenCL is not available")
         # Load the receiver configuration
         self.receiver = ReceiverLoader(self.receiver_config)
         self.video_capture = self.receiver.get_video_capture()
@@ -47,10 +180,31 @@ class FrameWorker:
                 detectors.append(detector)
         return detectors
 
-    @measure_frame_processing
-    def preprocess_frame(self, frame):
-        # Apply any preprocessing steps defined in the configuration
-        for preprocessor in self.preprocessors:
+    def _preprocess_buffer(self, step, shape, dtype):
+        """Return the reusable output array for a preprocessing step.
+        
+        Buffers are keyed by step index and output shape, so each stage
+        writes into the same array every frame instead of allocating one.
+        """
+        key = (step, shape, dtype)
+        buffer = self._preprocess_buffers.get(key)
+        if buffer is None:
+            buffer = np.empty(shape, dtype=dtype)
+            self._preprocess_buffers[key] = buffer
+        return buffer
+
+    @property
+    def preprocessors(self):
+        return self._preprocessors
+
+    @preprocessors.setter
+    def preprocessors(self, preprocessors):
+        """Compile the configured steps into callables once, not per frame."""
+        self._preprocessors = preprocessors
+        self._preprocess_buffers = {}
+        self._pipeline = []
+        self._umat_pipeline = []
+        for step, preprocessor in enumerate(preprocessors):
             match preprocessor["type"]:
                 case "resize":
                     width = preprocessor.get("width")
@@ -58,26 +212,94 @@ class FrameWorker:
                     # Convert to int if provided, otherwise keep as None
                     width = int(width) if width is not None else None
                     height = int(height) if height is not None else None
-                    frame = resize_frame(frame, width, height)
+                    self._pipeline.append(
+                        partial(self._resize_step, step, width, height))
+                    self._umat_pipeline.append(
+                        partial(self._resize_umat, width, height))
                 case "grayscale":
-                    frame = convert_to_grayscale(frame)
+                    self._pipeline.append(partial(self._grayscale_step, step))
+                    self._umat_pipeline.append(self._grayscale_umat)
             # Add more preprocessing steps as needed
+
+    def _resize_step(self, step, width, height, frame):
+        size = target_size(frame.shape, width, height)
+        if size is None:
+            return frame
+        dst = self._preprocess_buffer(
+            step, (size[1], size[0]) + frame.shape[2:], frame.dtype)
+        return resize_frame(frame, width, height, dst=dst)
+
+    def _grayscale_step(self, step, frame):
+        dst = self._preprocess_buffer(step, frame.shape[:2], frame.dtype)
+        return convert_to_grayscale(frame, dst=dst)
+
+    def _resize_umat(self, width, height, umat, shape):
+        size = target_size(shape, width, height)
+        if size is None:
+            return umat, shape
+        shrink = size[0] < shape[1] and size[1] < shape[0]
+        umat = cv2.resize(umat, size, interpolation=(
+            cv2.INTER_AREA if shrink else cv2.INTER_LINEAR))
+        return umat, (size[1], size[0]) + shape[2:]
+
+    def _grayscale_umat(self, umat, shape):
+        return cv2.cvtColor(umat, cv2.COLOR_BGR2GRAY), shape[:2]
+
+    def _preprocess_umat(self, frame):
+        """Run the preprocessing steps on an OpenCL UMat.
+        
+        The frame is uploaded once, every step runs on the device and the
+        result is downloaded once for the copy into shared memory. A UMat
+        has no shape, so each step also returns the resulting shape.
+        """
+        umat, shape = cv2.UMat(frame), frame.shape
+        for fn in self._umat_pipeline:
+            umat, shape = fn(umat, shape)
+        return umat.get()
+
+    @measure_frame_processing
+    def preprocess_frame(self, frame):
+        # Apply the preprocessing steps compiled from the configuration
+        if self._use_umat:
+            return self._preprocess_umat(frame)
+        for fn in self._pipeline:
+            frame = fn(frame)
         return frame
     
 
     def run(self):
+        self._install_signal_handlers()
         logger.info(
             f"FrameWorker started pid: {os.getpid()}"
         )
         self.load()
+        pid = os.getpid()
         # Ideally what we want to do is have each type of detector
         # already loaded and then we can just call detector.detect(frame)
         detectors = self.get_root_detectors()
         DetectorLoader(detectors)
+        detector_ids = [detector_id(d["type"]) for d in detectors]
 
-        last_processed_time = time.time()
+        # Fixed-rate schedule per detector on the monotonic clock, so the
+        # detection rate follows frequency_ms rather than the capture rate
+        periods = [int(float(d["frequency_ms"]) * 1_000_000) for d in detectors]
+        scales = [float(d["scale"]) if "scale" in d else None
+                  for d in detectors]
+        names = [d["name"] for d in detectors]
+        # Slots written for each detector but not yet queued as a batch
+        batch_sizes = [int(d.get("batch_size", 1)) for d in detectors]
+        pending = [[] for _ in detectors]
+        next_due = [time.monotonic_ns()] * len(detectors)
+        grabbed = 0
         while self.video_capture.isOpened() and not self.shutdown_requested:
-            ret, frame = self.video_capture.read()
+            if self.max_frames is not None and grabbed >= self.max_frames:
+                logger.info(f"FrameWorker reached max_frames={self.max_frames}")
+                break
+            grabbed += 1
+
+            # grab() keeps the capture draining; frames no detector is due
+            # for are never retrieved or preprocessed
+            ret = self.video_capture.grab()
             if not ret:
                 logger.error(
                     f"Failed to retrieve frame (PID: {os.getpid()})"
@@ -89,68 +311,93 @@ class FrameWorker:
             if self.shutdown_requested:
                 logger.info("Shutdown requested, stopping frame processing")
                 break
-            frame = self.preprocess_frame(frame)
-
-            elapsed_time = (
-                (time.time() - last_processed_time) * 1000
-            )  # Convert to milliseconds
-            for detector in detectors:
-                if elapsed_time > float(detector["frequency_ms"]):
-                    # Scale the frame to the desired size
-                    if "scale" in detector:
-                        scale = float(detector["scale"])
-                        frame = cv2.resize(
-                            frame, (0, 0), fx=scale, fy=scale
-                        )
 
-                    # Copy frame to shared memory
-                    logger.info(
-                        f"Worker: Frame shape: {frame.shape}, "
-                        f"type: {frame.dtype} (PID: {os.getpid()})"
-                    )
-                    shm = shared_memory.SharedMemory(
-                        name=self.shared_memory_name
-                    )
-                    shm_array = np.ndarray(
-                        frame.shape, dtype=frame.dtype, buffer=shm.buf
-                    )
-                    np.copyto(shm_array, frame)
-
-                    # Create a Frame object to send to the queue
-                    frame_data = Frame(
-                        detector=detector['name'],
-                        frame_id=str(time.time()),
-                        shape=frame.shape,
-                        frame_type=frame.dtype,
-                        timestamp=int(time.time() * 1000),
-                        shared_memory_name=self.shared_memory_name,
-                        # shared_memory_lock=Lock()
-                    )
+            # One clock read per frame serves scheduling and the header
+            now_ns = time.monotonic_ns()
+            due = [i for i, t in enumerate(next_due) if now_ns >= t]
+            for i in due:
+                next_due[i] += periods[i]
+                if next_due[i] <= now_ns:
+                    # Fell behind; skip missed ticks instead of bursting
+                    next_due[i] = now_ns + periods[i]
 
-                    last_processed_time = time.time()
-                    self.queue.put(frame_data)
-                    logger.info(
-                        f"Sent to queue: {detector['name']} "
-                        f"(PID: {os.getpid()})"
+            if due:
+                ret, frame = self.video_capture.retrieve()
+                if not ret:
+                    logger.error(
+                        f"Failed to decode frame (PID: {os.getpid()})"
                     )
+                    break
+                frame = self.preprocess_frame(frame)
 
-            # Process the frame (e.g., run detection)
-            # For now, we will just display the frame
-            # cv2.imshow('RTSP Stream', frame)
+            for i in due:
+                det_id = detector_ids[i]
+                # Size of the frame sent to this detector
+                shape = frame.shape
+                if scales[i] is not None:
+                    shape = (int(frame.shape[0] * scales[i]),
+                             int(frame.shape[1] * scales[i])) + frame.shape[2:]
 
-            # Check for 'q' key press or shutdown request
-            key = cv2.waitKey(1) & 0xFF
-            if key == ord('q') or self.shutdown_requested:
-                if key == ord('q'):
-                    logger.info("'q' key pressed, stopping frame processing")
-                break
+                # Write frame to shared memory
+                slot = self._seq % self.slot_count
+                offset = slot * self._slot_size
+                key = (slot, shape, frame.dtype)
+                payload = self._views.get(key)
+                if payload is None:
+                    nbytes = int(np.prod(shape)) * frame.itemsize
+                    if nbytes > self._slot_size - PAYLOAD_OFFSET:
+                        raise ValueError(
+                            f"Frame of {nbytes} bytes does not fit in a "
+                            f"shared memory slot of {self._slot_size} bytes"
+                        )
+                    payload = payload_view(self._shm.buf, offset, shape,
+                                           frame.dtype)
+                    self._views[key] = payload
+                write_header(self._shm.buf, offset, det_id, shape, frame.dtype,
+                             self._seq, now_ns)
+                if shape == frame.shape:
+                    np.copyto(payload, frame)
+                else:
+                    # Scale straight into the slot, no intermediate frame
+                    cv2.resize(frame, (shape[1], shape[0]), dst=payload,
+                               interpolation=cv2.INTER_LINEAR)
+                self._seq += 1
+
+                # Only slot indexes cross the queue: one int per frame, or
+                # a tuple of slots once a detector's batch is full
+                if batch_sizes[i] > 1:
+                    pending[i].append(slot)
+                    if len(pending[i]) < batch_sizes[i]:
+                        continue
+                    self.queue.put(tuple(pending[i]))
+                    pending[i] = []
+                else:
+                    self.queue.put(slot)
+                # Per-frame logs use loguru's deferred formatting so they
+                # cost nothing unless TRACE is enabled
+                logger.trace("Sent to queue: {} {} (PID: {})",
+                             names[i], shape, pid)
 
         logger.info("FrameWorker exiting main loop")
+        # Queue partial batches before unload() sends STOP, so frames
+        # already written to shared memory still reach a detector
+        for slots in pending:
+            if not slots:
+                continue
+            try:
+                self.queue.put(tuple(slots), timeout=1.0)
+            except queue.Full:
+                logger.warning(f"Work queue full, dropped a batch of "
+                               f"{len(slots)} frames")
         self.unload()
 
     def unload(self):
         # Unload the receiver configuration
-        self.queue.put("STOP")
+        try:
+            self.queue.put("STOP", timeout=1.0)
+        except queue.Full:
+            logger.warning("Work queue full, could not send STOP signal")
         if self.video_capture is not None:
             self.video_capture.release()
-        cv2.destroyAllWindows()
+        self._close_shared_memory()
+        flush_timing()
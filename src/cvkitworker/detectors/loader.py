@@ -1,24 +1,47 @@
 class DetectorLoader:
-    def __init__(self, detectors_config):
+    def __init__(self, detectors_config, worker_count=1):
         self.detectors_config = detectors_config
+        self.worker_count = worker_count
         self.detectors = []
+        self.model = None
 
     def load_model(self):
+        # Frame headers carry the detector type, not which config entry the
+        # frame was scheduled for, so a second face detector could not be told
+        # apart from the first
+        face_detectors = [d for d in self.detectors_config
+                          if d["type"] == "face_detector"]
+        if len(face_detectors) > 1:
+            raise ValueError(f"Only one face_detector can be configured, "
+                             f"got {len(face_detectors)}")
         # Load the model from the specified path
         for detector in self.detectors_config:
             if detector["type"] == "face_detector":
                 # Load face detection model
                 from .detectors.face_detect import FaceDetector
                 
-                # Get detector variant (dlib, dlib_cnn, opencv_dnn, yunet)
+                # Get detector variant (dlib, dlib_cnn, opencv_dnn, yunet, coreml, noop)
                 detector_name = detector.get("variant", "dlib")
                 model_path = detector.get("model_path")
                 device = detector.get("device", "cpu")
+                cache = bool(detector.get("cache", False))
+                min_face_px = detector.get("min_face_px")
                 
                 self.model = FaceDetector(
                     detector_name=detector_name,
                     model_path=model_path,
-                    device=device
+                    device=device,
+                    cache=cache,
+                    min_face_px=int(min_face_px) if min_face_px else None,
+                    worker_count=self.worker_count
                 )
             else:
                 raise ValueError(f"Unknown detector type: {detector['type']}")
+
+
+def accepts_grayscale(detector_config):
+    """Whether a configured detector can run on grayscale frames."""
+    if detector_config["type"] == "face_detector":
+        from .detectors.face_detect import FaceDetector
+        return FaceDetector.accepts_grayscale(detector_config.get("variant", "dlib"))
+    return False
@@ -0,0 +1,63 @@
+"""
+Fixed-size frame header stored in front of the pixel data of each
+shared memory slot, so the work queue only needs to carry a slot index.
+"""
+
+import struct
+
+import numpy as np
+
+
+# detector_id, height, width, channels, dtype_id, seq, timestamp_ns
+# (timestamp from time.monotonic_ns(), comparable across processes)
+HEADER = struct.Struct("<B3HBQQ")
+
+# Pixel data starts at a cache-line aligned offset after the header
+PAYLOAD_OFFSET = 64
+
+# Detector types that can be encoded in the header, indexed by detector_id
+DETECTOR_TYPES = ("face_detector",)
+
+# Frame dtypes that can be encoded in the header, indexed by dtype_id
+DTYPES = (np.dtype(np.uint8), np.dtype(np.uint16), np.dtype(np.float32))
+
+
+def detector_id(detector_type):
+    """Return the header id for a detector type name."""
+    try:
+        return DETECTOR_TYPES.index(detector_type)
+    except ValueError:
+        raise ValueError(f"Unknown detector type: {detector_type}")
+
+
+def write_header(buf, offset, det_id, shape, dtype, seq, timestamp):
+    """Pack the header for a frame of the given shape and dtype at offset."""
+    height, width = shape[:2]
+    channels = shape[2] if len(shape) == 3 else 1
+    HEADER.pack_into(buf, offset, det_id, height, width, channels,
+                     DTYPES.index(np.dtype(dtype)), seq, timestamp)
+
+
+def payload_view(buf, offset, shape, dtype):
+    """Return a writable view of the pixel data of the slot at offset."""
+    return np.ndarray(shape, dtype=dtype, buffer=buf,
+                      offset=offset + PAYLOAD_OFFSET)
+
+
+def write_frame(buf, offset, det_id, frame, seq, timestamp):
+    """Pack the header and copy the frame into the slot at offset."""
+    write_header(buf, offset, det_id, frame.shape, frame.dtype, seq, timestamp)
+    np.copyto(payload_view(buf, offset, frame.shape, frame.dtype), frame)
+
+
+def read_frame(buf, offset):
+    """Unpack the slot at offset.
+
+    Returns (detector_id, frame, seq, timestamp) where frame is a view into
+    the shared buffer, not a copy.
+    """
+    det_id, height, width, channels, dtype_id, seq, timestamp = \
+        HEADER.unpack_from(buf, offset)
+    shape = (height, width) if channels == 1 else (height, width, channels)
+    frame = payload_view(buf, offset, shape, DTYPES[dtype_id])
+    return det_id, frame, seq, timestamp
@@ -2,34 +2,46 @@ import cv2
 from ..utils.timing import measure_scaling, measure_color_conversion
 
 
-@measure_scaling
-def resize_frame(frame, width, height):
-    """Resize frame with timing measurement, maintaining aspect ratio.
+def target_size(shape, width, height):
+    """Return the (width, height) resize_frame produces for a frame shape.
     
-    If only width is provided (height=None), scale to that width.
-    If only height is provided (width=None), scale to that height.
-    If both are provided, use the old behavior (may distort image).
+    Returns None when neither width nor height is given.
     """
-    orig_height, orig_width = frame.shape[:2]
+    orig_height, orig_width = shape[:2]
     
     if width is not None and height is None:
         # Scale by width, maintain aspect ratio
-        scale_factor = width / orig_width
-        new_height = int(orig_height * scale_factor)
-        return cv2.resize(frame, (width, new_height))
+        return width, int(orig_height * (width / orig_width))
     elif height is not None and width is None:
         # Scale by height, maintain aspect ratio
-        scale_factor = height / orig_height
-        new_width = int(orig_width * scale_factor)
-        return cv2.resize(frame, (new_width, height))
+        return int(orig_width * (height / orig_height)), height
+    elif width is None and height is None:
+        return None
+    return width, height
+
+
+@measure_scaling
+def resize_frame(frame, width, height, dst=None):
+    """Resize frame with timing measurement, maintaining aspect ratio.
+    
+    If only width is provided (height=None), scale to that width.
+    If only height is provided (width=None), scale to that height.
+    If both are provided, use the old behavior (may distort image).
+    When ``dst`` is given the result is written into it instead of a new
+    array; it must already have the target shape and dtype.
+    """
+    size = target_size(frame.shape, width, height)
+    if size is None:
+        return frame
+    # INTER_AREA is both cheaper and cleaner than INTER_LINEAR for shrinking
+    if size[0] < frame.shape[1] and size[1] < frame.shape[0]:
+        interpolation = cv2.INTER_AREA
     else:
-        # Both provided or both None - use original behavior
-        if width is None and height is None:
-            return frame
-        return cv2.resize(frame, (width, height))
+        interpolation = cv2.INTER_LINEAR
+    return cv2.resize(frame, size, dst=dst, interpolation=interpolation)
 
 
 @measure_color_conversion
-def convert_to_grayscale(frame):
+def convert_to_grayscale(frame, dst=None):
     """Convert frame to grayscale with timing measurement."""
-    return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
\ No newline at end of file
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=dst)
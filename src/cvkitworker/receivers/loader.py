@@ -4,7 +4,19 @@ import os
 import platform
 
 
+# GStreamer hardware decoder element per platform, formatted with the codec
+HW_DECODERS = {
+    "jetson": "nvv4l2decoder ! nvvidconv ! video/x-raw,format=BGRx",
+    "Darwin": "vtdec",
+    "Windows": "d3d11{codec}dec",
+    "Linux": "nv{codec}dec",
+}
+
+
 class ReceiverLoader:
+    # Result of _enumerate_cameras, probed at most once per process
+    _available_cameras = None
+
     def __init__(self, receivers):
         self.receivers = receivers
         self.video_capture = None
@@ -16,7 +28,11 @@ class ReceiverLoader:
         for config in self.receivers:
             if config["type"] == "rtsp":
                 # Load RTSP receiver
-                self.video_capture = cv2.VideoCapture(config["url"])
+                if config.get("hw_decode", False):
+                    self.video_capture = self._create_hw_stream_capture(
+                        config["url"], config.get("codec", "h264"))
+                else:
+                    self.video_capture = cv2.VideoCapture(config["url"])
             elif config["type"] == "file":
                 # Load file receiver
                 file_path = config["source"]
@@ -38,8 +54,48 @@ class ReceiverLoader:
             # we will only deal with one receiver for now
             break
 
+    def _hw_decoder(self, codec):
+        """Return the GStreamer hardware decoder element for this platform."""
+        if os.path.exists("/etc/nv_tegra_release"):
+            return HW_DECODERS["jetson"]
+        decoder = HW_DECODERS.get(platform.system())
+        return decoder.format(codec=codec) if decoder else None
+
+    def _create_hw_stream_capture(self, url, codec="h264"):
+        """Open an RTSP stream through a GStreamer hardware decode pipeline.
+        
+        Falls back to OpenCV's default (CPU FFmpeg) capture when OpenCV was
+        built without GStreamer, there is no known decoder for the platform,
+        or the pipeline fails to open.
+        """
+        decoder = self._hw_decoder(codec)
+        gstreamer = any(
+            line.strip().startswith("GStreamer:") and "YES" in line
+            for line in cv2.getBuildInformation().splitlines())
+        
+        if gstreamer and decoder:
+            pipeline = (
+                f"rtspsrc location={url} latency=0 ! rtp{codec}depay ! "
+                f"{codec}parse ! {decoder} ! videoconvert ! "
+                f"video/x-raw,format=BGR ! appsink drop=true max-buffers=1"
+            )
+            cap = cv2.VideoCapture(pipeline, cv2.CAP_GSTREAMER)
+            if cap.isOpened():
+                logger.info(f"Opened {url} with hardware decoder {decoder.split()[0]}")
+                return cap
+            cap.release()
+            logger.warning(f"Hardware decode pipeline failed for {url}, using default backend")
+        else:
+            logger.warning(f"Hardware decode not available (GStreamer: {gstreamer}, "
+                           f"decoder: {decoder}), using default backend")
+        
+        return cv2.VideoCapture(url)
+
     def _enumerate_cameras(self):
         """Enumerate available camera devices for debugging."""
+        if ReceiverLoader._available_cameras is not None:
+            return ReceiverLoader._available_cameras
+        
         available_cameras = []
         logger.debug("Enumerating available cameras...")
         
@@ -51,9 +107,9 @@ class ReceiverLoader:
                     cap = cv2.VideoCapture(i)
                 
                 if cap.isOpened():
-                    # Try to read a frame to verify the camera works
-                    ret, frame = cap.read()
-                    if ret and frame is not None:
+                    # Grabbing verifies the camera delivers frames without
+                    # paying for a decode
+                    if cap.grab():
                         width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
                         height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
                         fps = cap.get(cv2.CAP_PROP_FPS)
@@ -73,6 +129,7 @@ class ReceiverLoader:
         else:
             logger.warning("No cameras detected")
         
+        ReceiverLoader._available_cameras = available_cameras
         return available_cameras
 
     def _create_camera_capture(self, camera_index):
@@ -20,7 +20,10 @@ but the consumers do the frame processing. Currently this is done using a shared
 '''
 
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+
+import cv2
+import numpy as np
 
 @dataclass
 class Frame():
@@ -28,7 +31,10 @@ class Frame():
     height: int
     color_space: str
     bit_depth: int
-    frame_data: bytes = None  # Placeholder for frame data, could be an image or video frame
+    # Pixel data held as an array (often a view into FrameProcessor's
+    # buffer) so chain stages never convert bytes back to an image
+    data: np.ndarray = None
+    meta: dict = field(default_factory=dict)
     
 class FrameProcess(Frame):
     def __init__(self, width: int, height: int, color_space: str, bit_depth: int):
@@ -53,7 +59,7 @@ class Detector(FrameProcess):
         '''
         pass
     
-@dataclass
+@dataclass(kw_only=True)
 class Detection(Frame):
     x: int
     y: int
@@ -79,7 +85,7 @@ class FaceDetector(Detector):
         
         return frame  
     
-def PreProcessor(FrameProcess):
+class PreProcessor(FrameProcess):
     '''
     A class that provides functions for preprocessing frames
     '''
@@ -92,37 +98,71 @@ def PreProcessor(FrameProcess):
         '''
         return frame  # Placeholder, should return a preprocessed frame
 
-def PreProcessorGrayscale(PreProcessor):
+class PreProcessorGrayscale(PreProcessor):
     '''
     A class that provides functions for preprocessing frames to grayscale
     '''
     def __init__(self):
         super().__init__()
+        self.gray = None  # Output buffer reused for every frame
     
     def preprocess(self, frame: Frame) -> Frame:
         '''
         Convert the frame to grayscale
         '''
-        # Placeholder for actual grayscale conversion logic
+        self.gray = cv2.cvtColor(frame.data, cv2.COLOR_BGR2GRAY, dst=self.gray)
+        frame.data = self.gray
         frame.color_space = 'grayscale'
-        return frame  # Should return a grayscale frame
+        return frame
+
+    def preprocess_batch(self, frames: np.ndarray) -> np.ndarray:
+        '''
+        Convert an (N, H, W, 3) batch, e.g. FrameProcessor.frames, to (N, H, W)
+        '''
+        if self.gray is None or self.gray.shape != frames.shape[:3]:
+            self.gray = np.empty(frames.shape[:3], dtype=frames.dtype)
+        for i in range(frames.shape[0]):
+            cv2.cvtColor(frames[i], cv2.COLOR_BGR2GRAY, dst=self.gray[i])
+        return self.gray
 
 class FrameProcessor():
     '''
     A class that provides functions for a list of frames to process
+    
+    Frames are stored structure-of-arrays style in one preallocated
+    (capacity, H, W, C) array used as a ring, so a whole batch can be
+    handed to a processor without gathering individual frames.
     '''
-    def __init__(self):
-        self.frames = []
+    def __init__(self, capacity: int, height: int, width: int, channels: int = 3,
+                 dtype=np.uint8):
+        self.frames = np.empty((capacity, height, width, channels), dtype=dtype)
+        self.meta = [None] * capacity
+        self.capacity = capacity
+        self.write_idx = 0
         self.index = 0
-        pass
     
-    def __next__():
-        pass
+    def __iter__(self):
+        return self
+    
+    def __next__(self) -> Frame:
+        if self.index >= self.write_idx:
+            raise StopIteration
+        if self.write_idx - self.index > self.capacity:
+            # Oldest frames were overwritten; resume at the oldest kept
+            self.index = self.write_idx - self.capacity
+        slot = self.index % self.capacity
+        self.index += 1
+        height, width = self.frames.shape[1:3]
+        return Frame(width, height, 'BGR', self.frames.itemsize * 8,
+                     data=self.frames[slot], meta=self.meta[slot])
     
     def append_frame(self, frame: Frame):
         '''
-        Append a frame to the list of frames
+        Copy a frame into the next slot of the ring buffer
         '''
-        self.frames.append(frame)
+        slot = self.write_idx % self.capacity
+        self.frames[slot] = frame.data
+        self.meta[slot] = frame.meta
+        self.write_idx += 1
     
     
@@ -1,13 +1,33 @@
 from abc import ABC, abstractmethod
-from typing import Any, Tuple
+from typing import Any, Optional, Tuple
 import numpy as np
+import os
 
 
 class Processor(ABC):
+    # Log prefix, built on first use in the worker that runs the processor
+    _tag: Optional[str] = None
+
+    @property
+    def tag(self) -> str:
+        if self._tag is None:
+            self._tag = f"{type(self).__name__} {os.getpid()}"
+        return self._tag
+
+    def __getstate__(self):
+        # Spawned workers build their own tag with their own PID
+        state = self.__dict__.copy()
+        state.pop("_tag", None)
+        return state
+
     @abstractmethod
     def process(self, frame: np.ndarray, meta: Any = None) -> Tuple[np.ndarray, Any]:
         pass
 
+    def close(self):
+        """Release resources held across frames."""
+        pass
+
 
 class PreProcessor(Processor):
     pass
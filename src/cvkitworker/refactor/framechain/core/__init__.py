@@ -1,4 +1,5 @@
 from .processor_chain import ProcessorChain
-from .frame_processing import frame_producer, frame_consumer
+from .descriptor_ring import SPSCDescriptorRing
+from .frame_processing import frame_producer, frame_consumer, use_threads
 
-__all__ = ['ProcessorChain', 'frame_producer', 'frame_consumer']
\ No newline at end of file
+__all__ = ['ProcessorChain', 'SPSCDescriptorRing', 'frame_producer', 'frame_consumer', 'use_threads']
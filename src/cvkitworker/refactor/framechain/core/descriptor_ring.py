@@ -0,0 +1,56 @@
+from multiprocessing.sharedctypes import RawArray, RawValue
+import time
+from typing import Optional, Tuple
+
+
+# Slot value that tells the consumer to exit
+STOP = 2 ** 64 - 1
+
+# Back-off while the ring is full or empty
+POLL_INTERVAL = 0.0001
+
+
+class SPSCDescriptorRing:
+    """Single-producer single-consumer ring of (slot, ts_ns) descriptors.
+
+    Head and tail live in shared memory and each is written by one side
+    only, so neither push nor pop takes a lock or pickles anything. The
+    descriptor is stored before head is advanced, and the consumer reads it
+    before advancing tail.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError("capacity must be a positive integer")
+        self.capacity = capacity
+        self._descriptors = RawArray('Q', 2 * capacity)
+        self._head = RawValue('Q', 0)
+        self._tail = RawValue('Q', 0)
+
+    def __len__(self) -> int:
+        return self._head.value - self._tail.value
+
+    def push(self, slot: int, ts_ns: int = 0):
+        head = self._head.value
+        while head - self._tail.value >= self.capacity:
+            time.sleep(POLL_INTERVAL)
+        i = 2 * (head % self.capacity)
+        self._descriptors[i] = slot
+        self._descriptors[i + 1] = ts_ns
+        self._head.value = head + 1
+
+    def pop(self) -> Optional[Tuple[int, int]]:
+        """Block for the next descriptor; None once the producer stops."""
+        tail = self._tail.value
+        while self._head.value == tail:
+            time.sleep(POLL_INTERVAL)
+        i = 2 * (tail % self.capacity)
+        slot = self._descriptors[i]
+        ts_ns = self._descriptors[i + 1]
+        self._tail.value = tail + 1
+        if slot == STOP:
+            return None
+        return slot, ts_ns
+
+    def stop(self):
+        self.push(STOP)
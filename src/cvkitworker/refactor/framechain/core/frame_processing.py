@@ -1,47 +1,81 @@
-from multiprocessing import Queue, shared_memory
+from typing import List, Optional
 import numpy as np
 import time
 import os
-from ..models import FrameInfo
+import sys
+from loguru import logger
+from cvkitworker.utils.shared_buffer import SharedMemoryCircularBuffer
+from ..log import configure_logging
+from .descriptor_ring import SPSCDescriptorRing
 from .processor_chain import ProcessorChain
 
 
-def frame_producer(queue: Queue, num_frames: int, interval: float, shape, dtype, num_consumers: int):
-    shm_list = []
+# Distinct synthetic frames the producer cycles through
+SOURCE_FRAMES = 4
+
+
+def use_threads() -> bool:
+    """Whether to run the producer and consumers as threads of one process.
+
+    True on a free-threaded interpreter (3.13+ with the GIL disabled) or
+    when FRAMECHAIN_THREADS is set; the process-based path is the fallback.
+    """
+    if os.getenv("FRAMECHAIN_THREADS", "").lower() in ("true", "1", "yes"):
+        return True
+    return not getattr(sys, "_is_gil_enabled", lambda: True)()
+
+
+def _pin_to_core(core_id: Optional[int]):
+    """Keep the calling process (or thread) on one CPU so the frames it
+    touches stay in that core's caches."""
+    if core_id is not None and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, {core_id})
+        logger.debug("PID {} pinned to CPU {}", os.getpid(), core_id)
+
+
+def frame_producer(rings: List[SPSCDescriptorRing], num_frames: int, interval: float, ring_name: str, shape,
+                   dtype, core_id: Optional[int] = None):
+    """Write frames into the shared ring and hand their slots to the
+    consumers round-robin, one descriptor ring per consumer."""
+    configure_logging()
+    _pin_to_core(core_id)
+    ring = SharedMemoryCircularBuffer(shape, dtype, name=ring_name, create=False)
+    # Synthetic frames are generated once and cycled, so the loop neither
+    # allocates nor runs the RNG per frame; append is the only copy
+    rng = np.random.default_rng()
+    source_frames = rng.integers(0, 255, (SOURCE_FRAMES,) + tuple(shape), dtype=dtype)
+    pid = os.getpid()
     try:
         for i in range(num_frames):
-            arr = np.random.randint(0, 255, shape, dtype=dtype)
-            shm = shared_memory.SharedMemory(create=True, size=arr.nbytes)
-            shm_arr = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
-            np.copyto(shm_arr, arr)
-            frame_info = FrameInfo(shm_name=shm.name, shape=shape, dtype=arr.dtype.name, timestamp=time.time())
-            shm_list.append(shm)
-            print(f"Producer {os.getpid()} produced frame {i}")
-            queue.put(frame_info)
+            slot = ring.append(source_frames[i % SOURCE_FRAMES])
+            logger.trace("Producer {} produced frame {}", pid, i)
+            rings[i % len(rings)].push(slot, time.monotonic_ns())
             time.sleep(interval)
         
-        for _ in range(num_consumers):
-            queue.put(None)
-        
-        time.sleep(2)
+        for descriptors in rings:
+            descriptors.stop()
     finally:
-        for shm in shm_list:
-            try:
-                shm.close()
-                shm.unlink()
-            except FileNotFoundError:
-                pass
-
-
-def frame_consumer(queue: Queue, chain: ProcessorChain):
-    while True:
-        frame_info = queue.get()
-        if frame_info is None:
-            print(f"Consumer {os.getpid()} exiting.")
-            break
-        
-        shm = shared_memory.SharedMemory(name=frame_info.shm_name)
-        arr = np.ndarray(frame_info.shape, dtype=frame_info.dtype, buffer=shm.buf)
-        print(f"Consumer {os.getpid()} processing frame at {frame_info.timestamp}")
-        chain.run(arr)
-        shm.close()
\ No newline at end of file
+        ring.close()
+        logger.complete()
+
+
+def frame_consumer(descriptors: SPSCDescriptorRing, chain: ProcessorChain, ring_name: str, shape, dtype,
+                   core_id: Optional[int] = None):
+    configure_logging()
+    _pin_to_core(core_id)
+    ring = SharedMemoryCircularBuffer(shape, dtype, name=ring_name, create=False)
+    pid = os.getpid()
+    try:
+        while True:
+            descriptor = descriptors.pop()
+            if descriptor is None:
+                logger.debug("Consumer {} exiting.", pid)
+                break
+            
+            slot, ts_ns = descriptor
+            logger.trace("Consumer {} processing frame at {}", pid, ts_ns)
+            chain.run(ring.buffer[slot])
+    finally:
+        chain.close()
+        ring.close()
+        logger.complete()
\ No newline at end of file
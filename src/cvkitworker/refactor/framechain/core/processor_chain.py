@@ -6,9 +6,38 @@ from ..base import Processor
 class ProcessorChain:
     def __init__(self, processors: List[Processor]):
         self.processors = processors
+        if processors:
+            self.run = self._compile(processors)
+
+    @staticmethod
+    def _compile(processors: List[Processor]):
+        """Build a straight-line run function with each stage's bound
+        process method as a closure variable, so the per-frame path has no
+        list iteration or attribute lookups."""
+        names = [f"p{i}" for i in range(len(processors))]
+        lines = [f"def _make({', '.join(names)}):",
+                 "    def _run(frame: np.ndarray):",
+                 "        meta = None"]
+        lines += [f"        frame, meta = {name}(frame, meta)" for name in names]
+        lines += ["        return frame",
+                  "    return _run"]
+        namespace = {"np": np}
+        exec(compile("\n".join(lines), "<chain>", "exec"), namespace)
+        return namespace["_make"](*(p.process for p in processors))
+
+    def __getstate__(self):
+        # The generated function can't be pickled; rebuild it on load
+        return {"processors": self.processors}
+
+    def __setstate__(self, state):
+        self.__init__(state["processors"])
+
+    def close(self):
+        for processor in self.processors:
+            processor.close()
 
     def run(self, frame: np.ndarray):
         meta = None
         for processor in self.processors:
             frame, meta = processor.process(frame, meta)
-        return frame
\ No newline at end of file
+        return frame
@@ -0,0 +1,23 @@
+import os
+import sys
+from loguru import logger
+
+
+# Process whose handler is installed, so its threads share one
+_configured_pid = None
+
+
+def configure_logging():
+    """Write framechain logs to stderr from a background thread.
+
+    FRAMECHAIN_LOG_LEVEL (default INFO) sets the threshold. Per-frame
+    messages are logged at TRACE, so with the default they cost a level
+    check and no formatting or write. Safe to call from every process and
+    thread; spawned processes do not inherit the handler.
+    """
+    global _configured_pid
+    if _configured_pid == os.getpid():
+        return
+    _configured_pid = os.getpid()
+    logger.remove()
+    logger.add(sys.stderr, level=os.getenv("FRAMECHAIN_LOG_LEVEL", "INFO"), enqueue=True)
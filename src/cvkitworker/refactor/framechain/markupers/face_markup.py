@@ -1,12 +1,12 @@
 from typing import Any, Tuple
 import numpy as np
 import time
-import os
+from loguru import logger
 from ..base import Markuper
 
 
 class FaceMarkup(Markuper):
     def process(self, frame: np.ndarray, meta: Any = None) -> Tuple[np.ndarray, Any]:
-        print(f"FaceMarkup {os.getpid()}")
+        logger.trace(self.tag)
         time.sleep(0.02)
         return frame, meta
\ No newline at end of file
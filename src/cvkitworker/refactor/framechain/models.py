@@ -1,17 +1,15 @@
-from dataclasses import dataclass
-from typing import List, Optional, Tuple
+from typing import List, NamedTuple, Optional, Tuple
 
 
-@dataclass
-class FrameInfo:
+class FrameInfo(NamedTuple):
     shm_name: str
     shape: Tuple[int, ...]
     dtype: str
+    slot: int
     timestamp: Optional[float] = None
 
 
-@dataclass
-class Detection:
+class Detection(NamedTuple):
     name: str
     polygon: List[Tuple[int, int]]
     metadata: Optional[dict] = None
\ No newline at end of file
@@ -1,15 +1,61 @@
 from typing import Any, Tuple
+import queue
+import threading
+import cv2
 import numpy as np
-import time
-import os
+from loguru import logger
 from ..base import Outputer
 
 
+# Frames waiting for the writer before process() blocks
+OUTPUT_QUEUE_SIZE = 4
+
+# Quality 80 without Huffman optimisation encodes noticeably faster than
+# OpenCV's default of 95; ignored for formats other than JPEG
+JPEG_WRITE_PARAMS = [int(cv2.IMWRITE_JPEG_QUALITY), 80, int(cv2.IMWRITE_JPEG_OPTIMIZE), 0]
+
+
 class OutputFile(Outputer):
+    """Save frames to filename from a background writer thread.
+
+    The encode and disk write run off the chain, so the consumer moves on
+    to the next frame while the previous one is written. The thread is
+    started on the first frame, in the process that runs the chain.
+    """
+
     def __init__(self, filename: str):
         self.filename = filename
+        self._queue = None
+        self._writer = None
+
+    def __getstate__(self):
+        # Threads and queues stay in the process that started them
+        return {"filename": self.filename}
+
+    def __setstate__(self, state):
+        self.__init__(state["filename"])
+
+    def _write_frames(self):
+        while True:
+            frame = self._queue.get()
+            if frame is None:
+                break
+            if not cv2.imwrite(self.filename, frame, JPEG_WRITE_PARAMS):
+                logger.warning("Failed to write {}", self.filename)
 
     def process(self, frame: np.ndarray, meta: Any = None) -> Tuple[np.ndarray, Any]:
-        print(f"Saving frame to {self.filename} {os.getpid()}")
-        time.sleep(0.1)
-        return frame, meta
\ No newline at end of file
+        logger.trace("{} saving frame to {}", self.tag, self.filename)
+        if self._writer is None:
+            self._queue = queue.Queue(maxsize=OUTPUT_QUEUE_SIZE)
+            self._writer = threading.Thread(target=self._write_frames, daemon=True)
+            self._writer.start()
+        # The frame's buffer is reused for the next frame, so queue a copy
+        self._queue.put(frame.copy())
+        return frame, meta
+
+    def close(self):
+        """Write out queued frames and stop the writer thread."""
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join()
+            self._writer = None
@@ -1,15 +1,25 @@
 from typing import Any, Tuple
+import cv2
 import numpy as np
-import time
-import os
+from loguru import logger
 from ..base import PreProcessor
 
 
 class Scale(PreProcessor):
     def __init__(self, scale_factor: float):
         self.scale_factor = scale_factor
+        # Output buffer, allocated on the first frame and reused after
+        self._out = None
+
+    def _output_for(self, frame: np.ndarray) -> np.ndarray:
+        h, w = frame.shape[:2]
+        shape = (max(1, round(h * self.scale_factor)), max(1, round(w * self.scale_factor))) + frame.shape[2:]
+        if self._out is None or self._out.shape != shape or self._out.dtype != frame.dtype:
+            self._out = np.empty(shape, dtype=frame.dtype)
+        return self._out
 
     def process(self, frame: np.ndarray, meta: Any = None) -> Tuple[np.ndarray, Any]:
-        print(f"Scale {os.getpid()}")
-        time.sleep(0.01)
-        return frame, meta
\ No newline at end of file
+        logger.trace(self.tag)
+        out = self._output_for(frame)
+        cv2.resize(frame, (out.shape[1], out.shape[0]), dst=out, interpolation=cv2.INTER_AREA)
+        return out, meta
@@ -1,25 +1,25 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional, Tuple, Any
-from dataclasses import dataclass
+from typing import List, NamedTuple, Optional, Tuple, Any
 import numpy as np
 import time
 import os
-from multiprocessing import Process, Queue, set_start_method
+import sys
+from multiprocessing import Process, Semaphore, SimpleQueue as ProcessQueue, set_start_method
+from queue import SimpleQueue
+from threading import Thread
 from multiprocessing import shared_memory
 
 
 # --- Frame and Detection Definitions ---
 
-@dataclass
-class FrameInfo:
+class FrameInfo(NamedTuple):
     shm_name: str
     shape: Tuple[int, ...]
     dtype: str
     timestamp: Optional[float] = None
 
 
-@dataclass
-class Detection:
+class Detection(NamedTuple):
     name: str
     polygon: List[Tuple[int, int]]
     metadata: Optional[dict] = None
@@ -100,25 +100,43 @@ class ProcessorChain:
 
 # --- Producer and Consumer Functions using Shared Memory ---
 
-def frame_producer(queue: Queue, num_frames: int, interval: float, shape, dtype, num_consumers: int):
+# Segments the producer cycles through. Consumers hand each one back once
+# its frame is processed, so a segment is never overwritten while being read
+# and consumers can keep their attachments
+NUM_SEGMENTS = 4
+
+
+def frame_producer(queue: ProcessQueue, free: ProcessQueue, finished: Semaphore, num_frames: int,
+                   interval: float, shape, dtype, num_consumers: int):
     shm_list = []
+    views = {}
     try:
+        size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        for _ in range(NUM_SEGMENTS):
+            shm = shared_memory.SharedMemory(create=True, size=size)
+            shm_list.append(shm)
+            free.put(shm.name)
+        # Frame views built once per segment, not per frame
+        views = {shm.name: np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+                 for shm in shm_list}
         for i in range(num_frames):
             arr = np.random.randint(0, 255, shape, dtype=dtype)
-            shm = shared_memory.SharedMemory(create=True, size=arr.nbytes)
-            shm_arr = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
-            np.copyto(shm_arr, arr)
-            frame_info = FrameInfo(shm_name=shm.name, shape=shape, dtype=arr.dtype.name, timestamp=time.time())  # FIXED: use arr.dtype.name
-            shm_list.append(shm)  # Keep reference to avoid premature GC
+            # Blocks until a consumer has returned a segment
+            name = free.get()
+            np.copyto(views[name], arr)
+            frame_info = FrameInfo(shm_name=name, shape=shape, dtype=arr.dtype.name, timestamp=time.time())  # FIXED: use arr.dtype.name
             print(f"Producer {os.getpid()} produced frame {i}")
             queue.put(frame_info)
             time.sleep(interval)
         # Signal consumers to stop
         for _ in range(num_consumers):
             queue.put(None)
-        # Wait for consumers to finish processing
-        time.sleep(2)
+        # Wait until every consumer has closed its segments
+        for _ in range(num_consumers):
+            finished.acquire()
     finally:
+        # Drop the frame views first; close() fails while they exist
+        views.clear()
         # Cleanup all shared memory blocks
         for shm in shm_list:
             try:
@@ -128,18 +146,63 @@ def frame_producer(queue: Queue, num_frames: int, interval: float, shape, dtype,
                 pass
 
 
-def frame_consumer(queue: Queue, chain: ProcessorChain):
+def frame_consumer(queue: ProcessQueue, free: ProcessQueue, finished: Semaphore, chain: ProcessorChain):
+    # Attached segments and their frame views, keyed by name; the producer
+    # reuses its NUM_SEGMENTS segments, so each is attached only once
+    shm_cache = {}
+    try:
+        while True:
+            frame_info = queue.get()
+            if frame_info is None:
+                print(f"Consumer {os.getpid()} exiting.")
+                break
+            cached = shm_cache.get(frame_info.shm_name)
+            if cached is None:
+                shm = shared_memory.SharedMemory(name=frame_info.shm_name)
+                arr = np.ndarray(frame_info.shape, dtype=frame_info.dtype, buffer=shm.buf)  # FIXED: pass dtype string
+                cached = shm_cache[frame_info.shm_name] = (shm, arr)
+            print(f"Consumer {os.getpid()} processing frame at {frame_info.timestamp}")
+            chain.run(cached[1])
+            # The producer may now overwrite this segment
+            free.put(frame_info.shm_name)
+    finally:
+        # Do not unlink here; producer will handle cleanup
+        # Drop the frame views first; close() fails while they exist
+        segments = [shm for shm, _ in shm_cache.values()]
+        shm_cache.clear()
+        for shm in segments:
+            shm.close()
+        finished.release()
+
+
+# --- Thread-based Producer and Consumer ---
+
+def use_threads() -> bool:
+    """Run as threads on a free-threaded interpreter (3.13+ with the GIL
+    disabled) or when FRAMECHAIN_THREADS is set."""
+    if os.getenv("FRAMECHAIN_THREADS", "").lower() in ("true", "1", "yes"):
+        return True
+    return not getattr(sys, "_is_gil_enabled", lambda: True)()
+
+
+def thread_frame_producer(queue: SimpleQueue, num_frames: int, interval: float, shape, dtype, num_consumers: int):
+    # Consumers share the address space, so frames are handed over by reference
+    for i in range(num_frames):
+        arr = np.random.randint(0, 255, shape, dtype=dtype)
+        print(f"Producer thread produced frame {i}")
+        queue.put(arr)
+        time.sleep(interval)
+    for _ in range(num_consumers):
+        queue.put(None)
+
+
+def thread_frame_consumer(queue: SimpleQueue, chain: ProcessorChain):
     while True:
-        frame_info = queue.get()
-        if frame_info is None:
-            print(f"Consumer {os.getpid()} exiting.")
+        arr = queue.get()
+        if arr is None:
+            print("Consumer thread exiting.")
             break
-        # Attach to shared memory
-        shm = shared_memory.SharedMemory(name=frame_info.shm_name)
-        arr = np.ndarray(frame_info.shape, dtype=frame_info.dtype, buffer=shm.buf)  # FIXED: pass dtype string
-        print(f"Consumer {os.getpid()} processing frame at {frame_info.timestamp}")
         chain.run(arr)
-        shm.close()  # Do not unlink here; producer will handle cleanup
 
 
 # --- Example Main Function for Testing ---
@@ -150,7 +213,13 @@ if __name__ == "__main__":
     except RuntimeError:
         pass
 
-    frame_queue = Queue(maxsize=10)
+    threaded = use_threads()
+    # SimpleQueue writes straight to its pipe from put(), with no feeder thread
+    frame_queue = SimpleQueue() if threaded else ProcessQueue()
+    # Names of the producer's segments that no consumer is reading
+    free_segments = None if threaded else ProcessQueue()
+    # Released by each consumer on exit, so the producer unlinks only then
+    finished = Semaphore(0)
     num_frames = 30
     interval = 0.03  # 30ms
     shape = (480, 640, 3)
@@ -165,15 +234,26 @@ if __name__ == "__main__":
 
     # Start consumers
     num_consumers = 2
-    consumers = [
-        Process(target=frame_consumer, args=(frame_queue, processor_chain))
-        for _ in range(num_consumers)
-    ]
+    if threaded:
+        consumers = [
+            Thread(target=thread_frame_consumer, args=(frame_queue, processor_chain), daemon=True)
+            for _ in range(num_consumers)
+        ]
+    else:
+        consumers = [
+            Process(target=frame_consumer, args=(frame_queue, free_segments, finished, processor_chain))
+            for _ in range(num_consumers)
+        ]
     for c in consumers:
         c.start()
 
     # Start producer
-    producer = Process(target=frame_producer, args=(frame_queue, num_frames, interval, shape, dtype, num_consumers))
+    if threaded:
+        producer = Thread(target=thread_frame_producer,
+                          args=(frame_queue, num_frames, interval, shape, dtype, num_consumers), daemon=True)
+    else:
+        producer = Process(target=frame_producer,
+                           args=(frame_queue, free_segments, finished, num_frames, interval, shape, dtype, num_consumers))
     producer.start()
 
     try:
@@ -182,6 +262,8 @@ if __name__ == "__main__":
             c.join()
     except KeyboardInterrupt:
         print("Interrupted! Attempting graceful shutdown...")
-        producer.terminate()
-        for c in consumers:
-            c.terminate()
+        # Daemon threads end with the process
+        if not threaded:
+            producer.terminate()
+            for c in consumers:
+                c.terminate()
@@ -2,11 +2,18 @@
 """
 FrameChain - Multi-processor frame processing pipeline
 """
-from multiprocessing import Process, Queue, set_start_method
+from multiprocessing import Process, set_start_method
+import copy
+import os
+from threading import Thread
 import numpy as np
 import time
+from loguru import logger
 
-from framechain.core import ProcessorChain, frame_producer, frame_consumer
+from cvkitworker.utils.cpu import available_cpus
+from cvkitworker.utils.shared_buffer import SharedMemoryCircularBuffer
+from framechain.log import configure_logging
+from framechain.core import ProcessorChain, SPSCDescriptorRing, frame_producer, frame_consumer, use_threads
 from framechain.preprocessors import Scale
 from framechain.detectors import FaceDetector
 from framechain.markupers import FaceMarkup
@@ -18,8 +25,8 @@ def main():
         set_start_method("spawn")
     except RuntimeError:
         pass
+    configure_logging()
 
-    frame_queue = Queue(maxsize=10)
     num_frames = 30
     interval = 0.03  # 30ms
     shape = (480, 640, 3)
@@ -32,15 +39,37 @@ def main():
         OutputFile("output.jpg")
     ])
 
+    # Threads share the chain and rings directly, with no pickling or attach
+    # cost, once numpy and OpenCV calls no longer contend for a GIL
+    threaded = use_threads()
+    Worker = Thread if threaded else Process
+
     num_consumers = 2
+    descriptor_capacity = 5
+    descriptor_rings = [SPSCDescriptorRing(descriptor_capacity) for _ in range(num_consumers)]
+    # Every queued descriptor plus one frame per consumer can be in use at once
+    ring = SharedMemoryCircularBuffer(shape, dtype, capacity=num_consumers * (descriptor_capacity + 1) + 1)
+    # Processors keep per-consumer buffers and writer threads, so threads
+    # each get their own copy of the chain as spawned processes do
+    # With CVKIT_PIN_CPUS, the first CPU is left to the OS, the producer
+    # takes the next and each consumer one of its own, if there are enough
+    cores = [None] * (num_consumers + 1)
+    if os.getenv('CVKIT_PIN_CPUS', '').lower() in ('true', '1', 'yes'):
+        cpus = available_cpus()
+        if len(cpus) > num_consumers + 1:
+            cores = cpus[1:num_consumers + 2]
+        else:
+            logger.warning("Not enough CPUs to pin the producer and {} consumers", num_consumers)
     consumers = [
-        Process(target=frame_consumer, args=(frame_queue, processor_chain))
-        for _ in range(num_consumers)
+        Worker(target=frame_consumer, daemon=threaded,
+               args=(descriptors, copy.deepcopy(processor_chain), ring.name, shape, dtype, core_id))
+        for descriptors, core_id in zip(descriptor_rings, cores[1:])
     ]
     for c in consumers:
         c.start()
 
-    producer = Process(target=frame_producer, args=(frame_queue, num_frames, interval, shape, dtype, num_consumers))
+    producer = Worker(target=frame_producer, daemon=threaded,
+                      args=(descriptor_rings, num_frames, interval, ring.name, shape, dtype, cores[0]))
     producer.start()
 
     try:
@@ -48,10 +77,15 @@ def main():
         for c in consumers:
             c.join()
     except KeyboardInterrupt:
-        print("Interrupted! Attempting graceful shutdown...")
-        producer.terminate()
-        for c in consumers:
-            c.terminate()
+        logger.warning("Interrupted! Attempting graceful shutdown...")
+        # Daemon threads end with the process
+        if not threaded:
+            producer.terminate()
+            for c in consumers:
+                c.terminate()
+    finally:
+        ring.close()
+        ring.unlink()
 
 
 if __name__ == "__main__":
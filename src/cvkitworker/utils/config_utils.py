@@ -3,12 +3,12 @@ import json
 import tempfile
 
 
-def create_file_config(file_path):
-    """Create temporary configuration for file input."""
+def build_file_config(file_path):
+    """Build configuration dictionary for file input."""
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"Video file not found: {file_path}")
     
-    config = {
+    return {
         "receivers": [
             {
                 "name": "file_input",
@@ -33,16 +33,11 @@ def create_file_config(file_path):
             }
         ]
     }
-    
-    # Create temporary config file
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-        json.dump(config, f, indent=2)
-        return f.name
 
 
-def create_webcam_config():
-    """Create temporary configuration for webcam input."""
-    config = {
+def build_webcam_config():
+    """Build configuration dictionary for webcam input."""
+    return {
         "receivers": [
             {
                 "name": "webcam_input",
@@ -67,8 +62,20 @@ def create_webcam_config():
             }
         ]
     }
-    
-    # Create temporary config file
+
+
+def _write_temp_config(config):
+    """Write configuration to a temporary JSON file and return its path."""
     with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
         json.dump(config, f, indent=2)
-        return f.name
\ No newline at end of file
+        return f.name
+
+
+def create_file_config(file_path):
+    """Create temporary configuration file for file input."""
+    return _write_temp_config(build_file_config(file_path))
+
+
+def create_webcam_config():
+    """Create temporary configuration file for webcam input."""
+    return _write_temp_config(build_webcam_config())
@@ -0,0 +1,55 @@
+"""
+CPU sharing between worker processes.
+
+Every worker runs its own OpenCV thread pool, so without limits N workers
+each start one thread per core and oversubscribe the machine.
+"""
+
+import os
+from typing import List, Optional
+
+import cv2
+from loguru import logger
+
+
+def available_cpus() -> List[int]:
+    """Return the CPUs this process may run on, in ascending order."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def cv_threads_per_worker(worker_count: int) -> int:
+    """Return the OpenCV thread count for each of worker_count workers.
+
+    CVKIT_CV_THREADS overrides the even split of the available CPUs.
+    """
+    override = os.getenv('CVKIT_CV_THREADS')
+    if override:
+        try:
+            return max(1, int(override))
+        except ValueError:
+            logger.warning(f"Invalid CVKIT_CV_THREADS value: {override}")
+    return max(1, len(available_cpus()) // max(1, worker_count))
+
+
+def configure_worker_cpus(worker_id: Optional[int], worker_count: int) -> None:
+    """Size OpenCV's thread pool for this worker and optionally pin it.
+
+    With CVKIT_PIN_CPUS set (Linux only) worker ``worker_id`` is pinned to
+    its own disjoint slice of the available CPUs.
+    """
+    threads = cv_threads_per_worker(worker_count)
+    cv2.setNumThreads(threads)
+
+    pin = os.getenv('CVKIT_PIN_CPUS', '').lower() in ('true', '1', 'yes')
+    if not pin or worker_id is None or not hasattr(os, "sched_setaffinity"):
+        logger.debug(f"OpenCV threads: {threads} (PID: {os.getpid()})")
+        return
+
+    cpus = available_cpus()
+    start = (worker_id * threads) % len(cpus)
+    pinned = {cpus[(start + i) % len(cpus)] for i in range(threads)}
+    os.sched_setaffinity(0, pinned)
+    logger.info(f"OpenCV threads: {threads}, pinned to CPUs {sorted(pinned)} "
+                f"(PID: {os.getpid()})")
@@ -1,4 +1,5 @@
 import json
+import os
 import subprocess
 from typing import Dict, List, Optional, Any, Union
 from dataclasses import dataclass
@@ -6,7 +7,7 @@ from loguru import logger
 from .webcam_probe import WebcamProbe, WebcamInfo
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class StreamInfo:
     """Information about a single stream in a video file."""
     index: int
@@ -38,9 +39,12 @@ class StreamInfo:
     tags: Optional[Dict[str, str]] = None
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class VideoInfo:
-    """Complete video file information."""
+    """Complete video file information.
+    
+    Frozen, since FFProbe hands the same cached instance to every caller.
+    """
     filename: str
     format_name: str
     format_long_name: str
@@ -55,15 +59,30 @@ class VideoInfo:
 class FFProbe:
     """Utility class to extract video metadata using ffprobe."""
     
-    def __init__(self, ffprobe_path: str = "ffprobe"):
+    def __init__(self, ffprobe_path: str = "ffprobe", backend: str = "ffprobe"):
         """
         Initialize FFProbe with optional custom path.
         
         Args:
             ffprobe_path: Path to ffprobe executable (default: "ffprobe")
+            backend: "ffprobe" to run the executable, or "pyav" to read the
+                container in-process with PyAV, avoiding a subprocess per probe
         """
+        if backend not in ("ffprobe", "pyav"):
+            raise ValueError(f"Unknown probe backend: {backend}")
         self.ffprobe_path = ffprobe_path
-        self._verify_ffprobe()
+        self.backend = backend
+        # Parsed results for local files, keyed by (path, mtime_ns, size)
+        self._cache: Dict[tuple, VideoInfo] = {}
+        if backend == "pyav":
+            try:
+                import av
+            except ImportError:
+                raise ImportError("PyAV is required for the pyav probe backend. "
+                                  "Install with: pip install av")
+            self._av = av
+        else:
+            self._verify_ffprobe()
     
     def _verify_ffprobe(self) -> None:
         """Verify ffprobe is available."""
@@ -80,6 +99,9 @@ class FFProbe:
         """
         Extract metadata from video file.
         
+        Results for local files are cached until the file's modification
+        time or size changes; URLs are probed on every call.
+        
         Args:
             video_path: Path to video file (local file or URL)
             
@@ -89,6 +111,20 @@ class FFProbe:
         Raises:
             RuntimeError: If ffprobe fails or video cannot be read
         """
+        run = self._run_pyav if self.backend == "pyav" else self._run_ffprobe
+        try:
+            stat = os.stat(video_path)
+        except (OSError, ValueError):
+            return run(video_path)
+        
+        key = (video_path, stat.st_mtime_ns, stat.st_size)
+        info = self._cache.get(key)
+        if info is None:
+            info = self._cache[key] = run(video_path)
+        return info
+    
+    def _run_ffprobe(self, video_path: str) -> VideoInfo:
+        """Run ffprobe on a file or URL and parse its output."""
         cmd = [
             self.ffprobe_path,
             "-v", "error",
@@ -115,6 +151,72 @@ class FFProbe:
         
         return self._parse_ffprobe_output(data, video_path)
     
+    def _run_pyav(self, video_path: str) -> VideoInfo:
+        """Read container and stream metadata in-process with PyAV."""
+        av = self._av
+        try:
+            container = av.open(video_path, timeout=5.0)
+        except (av.error.FFmpegError, OSError) as e:
+            logger.error(f"PyAV failed: {e}")
+            raise RuntimeError(f"Failed to probe video: {e}")
+        
+        with container:
+            return VideoInfo(
+                filename=video_path,
+                format_name=container.format.name,
+                format_long_name=container.format.long_name,
+                duration=container.duration / av.time_base if container.duration else 0.0,
+                size=os.path.getsize(video_path) if os.path.isfile(video_path) else 0,
+                bit_rate=container.bit_rate or 0,
+                nb_streams=len(container.streams),
+                streams=[self._pyav_stream(stream) for stream in container.streams],
+                format_tags=dict(container.metadata)
+            )
+    
+    @staticmethod
+    def _pyav_stream(av_stream) -> StreamInfo:
+        """Convert a PyAV stream to the same StreamInfo ffprobe produces."""
+        codec_context = av_stream.codec_context
+        fields = dict(
+            index=av_stream.index,
+            codec_name=codec_context.name,
+            codec_type=av_stream.type,
+            codec_long_name=codec_context.codec.long_name,
+            profile=codec_context.profile,
+            bit_rate=codec_context.bit_rate or None,
+            duration=float(av_stream.duration * av_stream.time_base) if av_stream.duration else None,
+            nb_frames=av_stream.frames or None,
+            tags=dict(av_stream.metadata)
+        )
+        
+        if av_stream.type == "video":
+            fields.update(
+                width=codec_context.width or None,
+                height=codec_context.height or None,
+                coded_width=codec_context.coded_width or None,
+                coded_height=codec_context.coded_height or None,
+                pix_fmt=codec_context.pix_fmt
+            )
+            if codec_context.display_aspect_ratio:
+                ratio = codec_context.display_aspect_ratio
+                fields["display_aspect_ratio"] = f"{ratio.numerator}:{ratio.denominator}"
+            if av_stream.average_rate:
+                rate = av_stream.average_rate
+                fields["avg_frame_rate"] = f"{rate.numerator}/{rate.denominator}"
+                fields["fps"] = float(rate)
+            if av_stream.time_base:
+                base = av_stream.time_base
+                fields["time_base"] = f"{base.numerator}/{base.denominator}"
+        
+        elif av_stream.type == "audio":
+            fields.update(
+                sample_rate=codec_context.sample_rate or None,
+                channels=codec_context.layout.nb_channels or None,
+                channel_layout=codec_context.layout.name
+            )
+        
+        return StreamInfo(**fields)
+    
     def _parse_ffprobe_output(self, data: Dict[str, Any], filename: str) -> VideoInfo:
         """Parse ffprobe JSON output into VideoInfo structure."""
         format_info = data.get("format", {})
@@ -141,10 +243,11 @@ class FFProbe:
     
     def _parse_stream(self, stream_data: Dict[str, Any]) -> StreamInfo:
         """Parse individual stream data."""
-        stream = StreamInfo(
+        codec_type = stream_data.get("codec_type", "")
+        fields = dict(
             index=int(stream_data.get("index", 0)),
             codec_name=stream_data.get("codec_name", ""),
-            codec_type=stream_data.get("codec_type", ""),
+            codec_type=codec_type,
             codec_long_name=stream_data.get("codec_long_name", ""),
             profile=stream_data.get("profile"),
             bit_rate=int(stream_data.get("bit_rate", 0)) if stream_data.get("bit_rate") else None,
@@ -154,31 +257,36 @@ class FFProbe:
         )
         
         # Video-specific fields
-        if stream.codec_type == "video":
-            stream.width = int(stream_data.get("width", 0)) if stream_data.get("width") else None
-            stream.height = int(stream_data.get("height", 0)) if stream_data.get("height") else None
-            stream.coded_width = int(stream_data.get("coded_width", 0)) if stream_data.get("coded_width") else None
-            stream.coded_height = int(stream_data.get("coded_height", 0)) if stream_data.get("coded_height") else None
-            stream.display_aspect_ratio = stream_data.get("display_aspect_ratio")
-            stream.pix_fmt = stream_data.get("pix_fmt")
-            stream.avg_frame_rate = stream_data.get("avg_frame_rate")
-            stream.time_base = stream_data.get("time_base")
+        if codec_type == "video":
+            avg_frame_rate = stream_data.get("avg_frame_rate")
+            fields.update(
+                width=int(stream_data.get("width", 0)) if stream_data.get("width") else None,
+                height=int(stream_data.get("height", 0)) if stream_data.get("height") else None,
+                coded_width=int(stream_data.get("coded_width", 0)) if stream_data.get("coded_width") else None,
+                coded_height=int(stream_data.get("coded_height", 0)) if stream_data.get("coded_height") else None,
+                display_aspect_ratio=stream_data.get("display_aspect_ratio"),
+                pix_fmt=stream_data.get("pix_fmt"),
+                avg_frame_rate=avg_frame_rate,
+                time_base=stream_data.get("time_base")
+            )
             
             # Calculate FPS from avg_frame_rate
-            if stream.avg_frame_rate:
+            if avg_frame_rate:
                 try:
-                    num, den = map(int, stream.avg_frame_rate.split('/'))
-                    stream.fps = num / den if den != 0 else None
+                    num, den = map(int, avg_frame_rate.split('/'))
+                    fields["fps"] = num / den if den != 0 else None
                 except (ValueError, ZeroDivisionError):
-                    stream.fps = None
+                    fields["fps"] = None
         
         # Audio-specific fields
-        elif stream.codec_type == "audio":
-            stream.sample_rate = int(stream_data.get("sample_rate", 0)) if stream_data.get("sample_rate") else None
-            stream.channels = int(stream_data.get("channels", 0)) if stream_data.get("channels") else None
-            stream.channel_layout = stream_data.get("channel_layout")
+        elif codec_type == "audio":
+            fields.update(
+                sample_rate=int(stream_data.get("sample_rate", 0)) if stream_data.get("sample_rate") else None,
+                channels=int(stream_data.get("channels", 0)) if stream_data.get("channels") else None,
+                channel_layout=stream_data.get("channel_layout")
+            )
         
-        return stream
+        return StreamInfo(**fields)
     
     def get_video_streams(self, video_info: VideoInfo) -> List[StreamInfo]:
         """Get all video streams from VideoInfo."""
@@ -0,0 +1,295 @@
+"""
+Fixed-capacity ring of equally shaped frames in one shared memory block.
+
+A small header at the start of the block holds the number of frames ever
+written and the ring's geometry, so every process that attaches by name sees
+the same state. Slots are allocated in a power of two so positions wrap with a
+mask.
+
+There is one writer and no lock. The writer copies a frame into its slot and
+only then publishes it with a single 8-byte store of the sequence counter;
+copying readers check the counter again afterwards and retry if the writer
+lapped the slots they read (a seqlock).
+"""
+
+import sys
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+
+# int64 fields at the start of the block: write sequence, capacity, layout,
+# dtype character code, frame ndim and up to three frame dimensions
+HEADER_SIZE = 64
+HEADER_FIELDS = HEADER_SIZE // 8
+MAX_FRAME_DIMS = HEADER_FIELDS - 5
+
+LAYOUTS = ("HWC", "CHW")
+
+# Attaching processes leave the block to its creator's resource tracker
+# (Python 3.13+); otherwise an unrelated attaching process would unlink it
+# at exit
+ATTACH_KWARGS = {"track": False} if sys.version_info >= (3, 13) else {}
+
+
+class SharedMemoryCircularBuffer:
+    """Circular buffer of frames backed by ``multiprocessing.shared_memory``.
+
+    The creating process owns the block and should ``unlink()`` it when done;
+    other processes attach with ``create=False`` and the same name. Frame
+    shape, dtype, capacity and layout are read from the block's header, so
+    attaching needs only the name; any of them passed as well must match.
+
+    Frames go in and come out as ``frame_shape`` (H, W, C). With
+    ``layout="CHW"`` each slot stores them as separate channel planes, so a
+    consumer that needs one channel reads it contiguously; ``buffer`` then
+    holds (slots, C, H, W).
+    """
+
+    def __init__(self, frame_shape: Optional[Tuple[int, ...]] = None,
+                 dtype=None, capacity: Optional[int] = None,
+                 name: Optional[str] = None, create: bool = True,
+                 layout: Optional[str] = None):
+        if create:
+            if frame_shape is None:
+                raise ValueError("frame_shape is required to create a buffer")
+            frame_shape = tuple(frame_shape)
+            dtype = np.dtype(np.uint8 if dtype is None else dtype)
+            layout = layout or "HWC"
+            if layout not in LAYOUTS:
+                raise ValueError(f"unknown layout: {layout}")
+            if layout == "CHW" and len(frame_shape) != 3:
+                raise ValueError("CHW layout needs (height, width, channels) frames")
+            if not 1 <= len(frame_shape) <= MAX_FRAME_DIMS:
+                raise ValueError(f"frames must have 1 to {MAX_FRAME_DIMS} dimensions")
+            if not capacity or capacity < 1:
+                raise ValueError("capacity must be a positive integer")
+            slots = 1 << capacity.bit_length()
+            frame_size = int(np.prod(frame_shape)) * dtype.itemsize
+            self._shm = shared_memory.SharedMemory(
+                name=name, create=True,
+                size=HEADER_SIZE + slots * frame_size)
+            self._meta = np.ndarray((HEADER_FIELDS,), dtype=np.int64,
+                                    buffer=self._shm.buf)
+            self._meta[:5] = (0, capacity, LAYOUTS.index(layout),
+                              ord(dtype.char), len(frame_shape))
+            self._meta[5:5 + len(frame_shape)] = frame_shape
+        else:
+            self._shm = shared_memory.SharedMemory(name=name, **ATTACH_KWARGS)
+            self._meta = np.ndarray((HEADER_FIELDS,), dtype=np.int64,
+                                    buffer=self._shm.buf)
+            stored = {
+                "frame_shape": tuple(int(d) for d in
+                                     self._meta[5:5 + int(self._meta[4])]),
+                "dtype": np.dtype(chr(self._meta[3])),
+                "capacity": int(self._meta[1]),
+                "layout": LAYOUTS[self._meta[2]],
+            }
+            given = {"frame_shape": None if frame_shape is None else tuple(frame_shape),
+                     "dtype": None if dtype is None else np.dtype(dtype),
+                     "capacity": capacity, "layout": layout}
+            for key, value in given.items():
+                if value is not None and value != stored[key]:
+                    self._meta = None
+                    self._shm.close()
+                    raise ValueError(f"{key} {value} does not match the "
+                                     f"buffer's {stored[key]}")
+            frame_shape, dtype, capacity, layout = stored.values()
+
+        self.frame_shape = frame_shape
+        self.dtype = dtype
+        self.layout = layout
+        self.frame_size = int(np.prod(self.frame_shape)) * self.dtype.itemsize
+        # Frames kept; the slot count is the next power of two above it, so
+        # there is always a spare slot for the writer to fill while readers
+        # copy the oldest frame
+        self.capacity = capacity
+        slots = 1 << capacity.bit_length()
+        self._mask = slots - 1
+        # (slots, *slot_shape) view over every slot, and the same slots
+        # seen as (slots, *frame_shape) for reading and writing frames
+        if layout == "CHW":
+            height, width, channels = self.frame_shape
+            slot_shape = (channels, height, width)
+        else:
+            slot_shape = self.frame_shape
+        self.buffer = np.ndarray((slots,) + slot_shape,
+                                 dtype=self.dtype, buffer=self._shm.buf,
+                                 offset=HEADER_SIZE)
+        self._frames = (self.buffer.transpose(0, 2, 3, 1) if layout == "CHW"
+                        else self.buffer)
+        # Per-slot frame views built once, so writes skip the indexing
+        self._slot_frames = list(self._frames)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @property
+    def seq(self) -> int:
+        """Number of frames appended since the block was created."""
+        return int(self._meta[0])
+
+    @property
+    def index(self) -> int:
+        """Slot the next append writes to."""
+        return self.seq & self._mask
+
+    @property
+    def count(self) -> int:
+        """Number of frames held, at most capacity."""
+        return min(self.seq, self.capacity)
+
+    @property
+    def is_full(self) -> bool:
+        return self.count == self.capacity
+
+    def append(self, frame: np.ndarray) -> int:
+        """Copy a frame into the next slot, overwriting the oldest when full.
+
+        Returns the slot index written. Only one process may append.
+        """
+        seq = int(self._meta[0])
+        slot = seq & self._mask
+        np.copyto(self._slot_frames[slot], frame)
+        # Publish only after the copy so readers never see a partial frame
+        self._meta[0] = seq + 1
+        return slot
+
+    @contextmanager
+    def reserve_slot(self) -> Iterator[np.ndarray]:
+        """Write the next frame in place instead of copying it in.
+
+        Yields a writable (H, W, C) view of the next slot, e.g. for a decoder
+        to fill; the frame is published when the block exits without an
+        exception. Only one process may append.
+        """
+        seq = int(self._meta[0])
+        yield self._slot_frames[seq & self._mask]
+        self._meta[0] = seq + 1
+
+    def _read(self, n: int, read):
+        """Run ``read(seq)`` over the newest ``n`` frames until no overwrite raced it.
+
+        Frame ``seq - n`` is the oldest read; its slot is reused once the
+        writer starts frame ``seq - n + slots``.
+        """
+        slots = self._mask + 1
+        while True:
+            seq = int(self._meta[0])
+            result = read(seq)
+            if int(self._meta[0]) - seq < slots - n:
+                return result
+
+    def get_last(self) -> Optional[np.ndarray]:
+        """Return a copy of the most recently appended frame.
+
+        Copies; use ``view_last()`` on hot paths.
+        """
+        if self.count == 0:
+            return None
+        return self._read(1, lambda seq: self._frames[(seq - 1) & self._mask].copy())
+
+    def get_all(self, copy: bool = True) -> List[np.ndarray]:
+        """Return all frames, oldest first.
+
+        Copies unless ``copy=False``, which is ``get_all_view()``. All
+        frames are gathered in one copy and returned as views into it.
+        """
+        if not copy:
+            return self.get_all_view()
+        n = len(self)
+        return self._read(n, lambda seq: list(np.concatenate(self._runs(seq, n))))
+
+    def view(self, i: int) -> np.ndarray:
+        """Return a read-only view of frame ``i``, counted from the oldest.
+
+        No data is copied, so the view changes when that slot is
+        overwritten; ``.copy()`` it if the producer may append meanwhile.
+        """
+        frame = self._frames[self._slot(i)]
+        frame.flags.writeable = False
+        return frame
+
+    def view_last(self) -> Optional[np.ndarray]:
+        """Return a read-only view of the newest frame; see view()."""
+        if self.count == 0:
+            return None
+        return self.view(-1)
+
+    def get_all_view(self) -> List[np.ndarray]:
+        """Return read-only views of all frames, oldest first; see view()."""
+        seq = self.seq
+        frames = []
+        for run in self._runs(seq, min(seq, self.capacity)):
+            run.flags.writeable = False
+            frames.extend(run)
+        return frames
+
+    def _runs(self, seq: int, n: int) -> List[np.ndarray]:
+        """Slice the newest ``n`` frames as of ``seq`` into at most two runs
+        of slots: up to the end of the block, then on from slot 0."""
+        start = (seq - n) & self._mask
+        end = seq & self._mask
+        if start <= end:
+            return [self._frames[start:end]]
+        return [self._frames[start:], self._frames[:end]]
+
+    def get_last_plane(self, channel: int) -> Optional[np.ndarray]:
+        """Return a read-only view of one channel of the newest frame.
+
+        Contiguous with the CHW layout, strided with HWC; see view().
+        """
+        if self.count == 0:
+            return None
+        plane = self._frames[(self.seq - 1) & self._mask, ..., channel]
+        plane.flags.writeable = False
+        return plane
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _back(self, i: int) -> int:
+        """Map frame ``i``, counted from the oldest, to its distance from the newest."""
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("buffer index out of range")
+        return n - i
+
+    def _slot(self, i: int) -> int:
+        """Map frame ``i``, counted from the oldest, to its slot."""
+        back = self._back(i)
+        return (self.seq - back) & self._mask
+
+    def __getitem__(self, i: int) -> np.ndarray:
+        """Return a copy of frame ``i``, counted from the oldest."""
+        back = self._back(i)
+        return self._read(back, lambda seq: self._frames[
+            (seq - back) & self._mask].copy())
+
+    def __iter__(self):
+        """Iterate over copies of all frames, oldest first, as one snapshot."""
+        return iter(self.get_all())
+
+    def close(self):
+        """Detach from the block; views into it must not be used after."""
+        self.buffer = None
+        self._frames = None
+        self._slot_frames = None
+        self._meta = None
+        self._shm.close()
+
+    def unlink(self):
+        """Free the block once every process has closed it."""
+        self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
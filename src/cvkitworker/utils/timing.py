@@ -4,22 +4,58 @@ Provides decorators and storage interfaces for performance monitoring.
 """
 
 import time
+import atexit
 import functools
 import os
 import json
+import threading
+import weakref
 from datetime import datetime
 from typing import Dict, Any, Optional, Callable
 from abc import ABC, abstractmethod
 from pathlib import Path
 from loguru import logger
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Pending bytes that trigger a write in FileTimingStorage
+FILE_BUFFER_SIZE = 64 * 1024
+
+# Process id for measurements, refreshed in forked children
+_pid = os.getpid()
+
+# Live FileTimingStorage instances, reset in forked children
+_file_storages = weakref.WeakSet()
+
+
+def _after_fork_in_child() -> None:
+    """Refresh the pid and drop measurements buffered by the parent, which
+    the parent writes itself."""
+    global _pid
+    _pid = os.getpid()
+    for storage in _file_storages:
+        storage._buffer = bytearray()
+        storage._lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
 
 class TimingStorage(ABC):
     """Abstract interface for storing timing measurements."""
     
     @abstractmethod
     def store_timing(self, measurement: Dict[str, Any]) -> None:
-        """Store a timing measurement."""
+        """Store a timing measurement.
+        
+        The dict is reused for the next measurement, so copy anything kept
+        beyond this call.
+        """
         pass
     
     @abstractmethod
@@ -33,28 +69,62 @@ class TimingStorage(ABC):
         pass
 
 
+def _json_line(measurement: Dict[str, Any]) -> bytes:
+    """Serialize a measurement as one JSON line, with orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(measurement, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(measurement) + '\n').encode()
+
+
 class FileTimingStorage(TimingStorage):
-    """File-based timing storage implementation."""
+    """File-based timing storage implementation.
+    
+    Measurements are buffered in memory and appended to the file in one
+    write once FILE_BUFFER_SIZE bytes are pending, on flush(), on close()
+    and at interpreter exit. multiprocessing children skip atexit, so worker
+    processes call flush_timing() before they exit.
+    """
     
     def __init__(self, file_path: str = "timing_measurements.jsonl"):
         self.file_path = Path(file_path)
         self.file_path.parent.mkdir(parents=True, exist_ok=True)
+        self._buffer = bytearray()
+        self._lock = threading.Lock()
+        atexit.register(self.flush)
+        _file_storages.add(self)
         
     def store_timing(self, measurement: Dict[str, Any]) -> None:
-        """Store timing measurement as JSON line in file."""
+        """Buffer timing measurement as a JSON line."""
         try:
-            with open(self.file_path, 'a') as f:
-                f.write(json.dumps(measurement) + '\n')
+            line = _json_line(measurement)
         except Exception as e:
             logger.error(f"Failed to store timing measurement: {e}")
+            return
+        with self._lock:
+            self._buffer += line
+            full = len(self._buffer) >= FILE_BUFFER_SIZE
+        if full:
+            self.flush()
     
     def flush(self) -> None:
-        """File storage auto-flushes, no action needed."""
-        pass
+        """Append buffered measurements to the file."""
+        with self._lock:
+            pending, self._buffer = self._buffer, bytearray()
+        if not pending:
+            return
+        try:
+            fd = os.open(self.file_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, pending)
+            finally:
+                os.close(fd)
+        except Exception as e:
+            logger.error(f"Failed to store timing measurements: {e}")
     
     def close(self) -> None:
-        """File storage auto-closes, no action needed."""
-        pass
+        """Flush buffered measurements."""
+        self.flush()
+        atexit.unregister(self.flush)
 
 
 class DatabaseTimingStorage(TimingStorage):
@@ -106,6 +176,8 @@ class TimingManager:
     def __init__(self):
         self.enabled = self._get_timing_enabled()
         self.storage = self._create_storage() if self.enabled else None
+        # One measurement dict per thread, refilled for every record
+        self._local = threading.local()
         
     def _get_timing_enabled(self) -> bool:
         """Check if timing measurement is enabled via environment or config."""
@@ -162,16 +234,23 @@ class TimingManager:
         if not self.enabled or not self.storage:
             return
         
-        measurement = {
-            'timestamp': datetime.utcnow().isoformat(),
-            'function': function_name,
-            'duration_ms': duration_ms,
-            'process_id': os.getpid(),
-            'context': context or {}
-        }
+        measurement = getattr(self._local, 'measurement', None)
+        if measurement is None:
+            measurement = self._local.measurement = {}
+        measurement['timestamp'] = datetime.utcnow().isoformat()
+        measurement['function'] = function_name
+        measurement['duration_ms'] = duration_ms
+        measurement['process_id'] = _pid
+        measurement['context'] = context or {}
         
+        # Storages must not keep the dict; see TimingStorage.store_timing()
         self.storage.store_timing(measurement)
     
+    def record_timing_ns(self, function_name: str, start_ns: int, end_ns: int,
+                        context: Dict[str, Any] = None) -> None:
+        """Record a measurement taken with time.perf_counter_ns()."""
+        self.record_timing(function_name, (end_ns - start_ns) / 1e6, context)
+    
     def flush(self) -> None:
         """Flush any pending measurements."""
         if self.storage:
@@ -195,21 +274,41 @@ def get_timing_manager() -> TimingManager:
     return _timing_manager
 
 
+def flush_timing() -> None:
+    """Write out this process's pending measurements, if timing was used."""
+    if _timing_manager is not None:
+        _timing_manager.flush()
+
+
+def _timing_disabled_by_env() -> bool:
+    """Check if CVKIT_TIMING_ENABLED explicitly turns timing off."""
+    return os.getenv('CVKIT_TIMING_ENABLED', '').lower() in ('false', '0', 'no', 'off')
+
+
 def measure_timing(function_name: Optional[str] = None, 
                   include_args: bool = False,
                   include_result: bool = False):
     """
     Decorator to measure execution time of functions.
     
+    With CVKIT_TIMING_ENABLED explicitly off (false/0/no/off) when the
+    function is decorated, it is returned unwrapped and costs nothing per
+    call. Otherwise the wrapper checks the timing manager on every call, so
+    timing can still be switched on after import.
+    
     Args:
         function_name: Override function name in measurements
         include_args: Include function arguments in context
         include_result: Include function result info in context
     """
     def decorator(func: Callable) -> Callable:
+        if _timing_disabled_by_env():
+            return func
+        measured_function_name = function_name or f"{func.__module__}.{func.__name__}"
+        
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            timing_manager = get_timing_manager()
+            timing_manager = _timing_manager or get_timing_manager()
             
             if not timing_manager.enabled:
                 # If timing is disabled, just call the function
@@ -259,7 +358,7 @@ def measure_timing(function_name: Optional[str] = None,
                     logger.debug(f"Failed to include args in timing context: {e}")
             
             # Measure execution time
-            start_time = time.perf_counter()
+            start_ns = time.perf_counter_ns()
             try:
                 result = func(*args, **kwargs)
                 
@@ -276,12 +375,8 @@ def measure_timing(function_name: Optional[str] = None,
                 
                 return result
             finally:
-                end_time = time.perf_counter()
-                duration_ms = (end_time - start_time) * 1000
-                
-                # Record the timing
-                measured_function_name = function_name or f"{func.__module__}.{func.__name__}"
-                timing_manager.record_timing(measured_function_name, duration_ms, context)
+                timing_manager.record_timing_ns(measured_function_name, start_ns,
+                                                time.perf_counter_ns(), context)
         
         return wrapper
     return decorator
@@ -0,0 +1,55 @@
+"""
+Shared fixtures for the test suite.
+"""
+
+import sys
+from pathlib import Path
+
+import cv2
+import pytest
+
+# Make the package importable from the source tree, once for every test module
+SRC_DIR = str(Path(__file__).parent.parent / 'src')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+TEST_VIDEO_PATH = Path(__file__).parent.parent / 'test_videos' / 'big_buck_bunny_480p.mp4'
+
+
+@pytest.fixture(scope="session")
+def video_probe():
+    """Open the test video once per session and return its properties.
+
+    The properties come from the container header; no frame is decoded.
+    ``opened`` is False when the video cannot be read; tests assert on that
+    rather than the fixture raising.
+    """
+    cap = cv2.VideoCapture(str(TEST_VIDEO_PATH))
+    try:
+        return {
+            "opened": cap.isOpened(),
+            "frame_count": int(cap.get(cv2.CAP_PROP_FRAME_COUNT)),
+            "fps": cap.get(cv2.CAP_PROP_FPS),
+            "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        }
+    finally:
+        cap.release()
+
+
+@pytest.fixture(scope="session")
+def video_frame():
+    """Decode the test video's first frame once per session.
+
+    None when the video cannot be read. Treat the frame as read-only, it is
+    shared by every test.
+    """
+    cap = cv2.VideoCapture(str(TEST_VIDEO_PATH))
+    try:
+        ret, frame = cap.read() if cap.isOpened() else (False, None)
+    finally:
+        cap.release()
+    if not ret:
+        return None
+    frame.flags.writeable = False
+    return frame
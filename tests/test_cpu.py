@@ -0,0 +1,28 @@
+import os
+from unittest.mock import patch
+from cvkitworker.utils.cpu import cv_threads_per_worker, available_cpus
+
+
+class TestCvThreads:
+    """Test the OpenCV thread split between detect workers."""
+
+    def test_even_split(self):
+        with patch("cvkitworker.utils.cpu.available_cpus",
+                   return_value=list(range(8))), \
+                patch.dict(os.environ, {}, clear=False):
+            os.environ.pop("CVKIT_CV_THREADS", None)
+            assert cv_threads_per_worker(4) == 2
+            assert cv_threads_per_worker(16) == 1
+
+    def test_env_override(self):
+        with patch.dict(os.environ, {"CVKIT_CV_THREADS": "3"}):
+            assert cv_threads_per_worker(4) == 3
+
+    def test_invalid_env_override(self):
+        with patch.dict(os.environ, {"CVKIT_CV_THREADS": "many"}), \
+                patch("cvkitworker.utils.cpu.available_cpus",
+                      return_value=list(range(4))):
+            assert cv_threads_per_worker(2) == 2
+
+    def test_available_cpus(self):
+        assert len(available_cpus()) >= 1
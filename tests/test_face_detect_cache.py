@@ -0,0 +1,211 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+from unittest.mock import Mock, patch
+from cvkitworker.detectors.detect_worker import DetectWorker
+from cvkitworker.detectors.frame_worker import FrameWorker
+from cvkitworker.detectors.loader import DetectorLoader
+from cvkitworker.detectors.detectors.face_detect import (
+    FaceDetector, DetectorKind, CACHE_MAX_HITS
+)
+
+
+class TestFaceDetectCache:
+    """Test the scene-change cache in FaceDetector.detect."""
+
+    def setup_method(self):
+        with patch.object(FaceDetector, "load"):
+            self.detector = FaceDetector("opencv_dnn", cache=True)
+        self.detector._kind = DetectorKind.OPENCV_DNN
+        self.detector.detector_lib = Mock()
+        self.detector.detector_lib.forward.return_value = np.array(
+            [[[[0, 1, 0.9, 0.1, 0.1, 0.3, 0.3]]]], dtype=np.float32)
+        rng = np.random.default_rng(0)
+        self.frame = rng.integers(0, 255, (120, 160, 3), dtype=np.uint8)
+
+    def test_static_scene_uses_cache(self):
+        """Test an unchanged frame skips the forward pass."""
+        first = self.detector.detect(self.frame)
+        second = self.detector.detect(self.frame.copy())
+
+        assert first == second
+        assert self.detector.detector_lib.forward.call_count == 1
+
+    def test_scene_change_runs_detection(self):
+        """Test a different frame runs the detector again."""
+        self.detector.detect(self.frame)
+        self.detector.detect(255 - self.frame)
+
+        assert self.detector.detector_lib.forward.call_count == 2
+
+    def test_cache_refresh(self):
+        """Test detection is forced after CACHE_MAX_HITS cached frames."""
+        for _ in range(CACHE_MAX_HITS + 2):
+            self.detector.detect(self.frame)
+
+        assert self.detector.detector_lib.forward.call_count == 2
+
+    def test_failed_detection_not_cached(self):
+        """Test a detector error is not served from the cache afterwards."""
+        forward = self.detector.detector_lib.forward
+        forward.side_effect = [RuntimeError("transient"), forward.return_value]
+
+        assert self.detector.detect(self.frame) == []
+        second = self.detector.detect(self.frame.copy())
+
+        assert len(second) == 1
+        assert forward.call_count == 2
+
+    def test_cache_disabled_by_default(self):
+        """Test detectors without cache=True always run detection."""
+        self.detector.cache = False
+        self.detector.detect(self.frame)
+        self.detector.detect(self.frame)
+
+        assert self.detector.detector_lib.forward.call_count == 2
+
+
+class TestYuNetInputSize:
+    """Test YuNet's input size is only reset when the frame size changes."""
+
+    def test_set_input_size_once_per_size(self):
+        with patch.object(FaceDetector, "load"):
+            detector = FaceDetector("yunet")
+        detector._kind = DetectorKind.YUNET
+        detector.detector_lib = Mock()
+        detector.detector_lib.detect.return_value = (1, None)
+
+        for _ in range(3):
+            detector.detect(np.zeros((120, 160, 3), dtype=np.uint8))
+        detector.detect(np.zeros((240, 320, 3), dtype=np.uint8))
+
+        assert detector.detector_lib.setInputSize.call_count == 2
+
+
+class TestDlibMinFaceSize:
+    """Test dlib runs on a shrunken frame when min_face_px allows it."""
+
+    def test_boxes_scaled_back(self):
+        with patch.object(FaceDetector, "load"):
+            detector = FaceDetector("dlib", min_face_px=160)
+        detector._kind = DetectorKind.DLIB
+        detector._dlib_scale = 0.5
+        rect = Mock()
+        rect.left.return_value, rect.top.return_value = 10, 20
+        rect.width.return_value, rect.height.return_value = 40, 40
+        detector.detector_lib = Mock(return_value=[rect])
+
+        faces = detector.detect(np.zeros((480, 640, 3), dtype=np.uint8))
+
+        # dlib saw a half-size RGB frame, boxes are in full-size pixels
+        assert detector.detector_lib.call_args.args[0].shape == (240, 320, 3)
+        assert faces == [{'x': 20, 'y': 40, 'width': 80, 'height': 80,
+                          'confidence': 1.0}]
+
+
+class TestDlibCnnBatch:
+    """Test dlib_cnn batches equally sized frames into one call."""
+
+    def setup_method(self):
+        with patch.object(FaceDetector, "load"):
+            self.detector = FaceDetector("dlib_cnn")
+        self.detector._kind = DetectorKind.DLIB_CNN
+        detection = Mock(confidence=0.8)
+        detection.rect.left.return_value, detection.rect.top.return_value = 1, 2
+        detection.rect.width.return_value, detection.rect.height.return_value = 3, 4
+        self.detector.detector_lib = Mock(return_value=[[detection], []])
+
+    def test_single_call(self):
+        frames = [np.full((60, 80, 3), i, dtype=np.uint8) for i in range(2)]
+
+        results = self.detector.detect_batch(frames)
+
+        assert self.detector.detector_lib.call_count == 1
+        images = self.detector.detector_lib.call_args.args[0]
+        # Each frame keeps its own converted image
+        assert [int(image[0, 0, 0]) for image in images] == [0, 1]
+        assert results == [[{'x': 1, 'y': 2, 'width': 3, 'height': 4,
+                             'confidence': 0.8}], []]
+
+    def test_mixed_sizes_fall_back(self):
+        self.detector.detector_lib.return_value = []
+        frames = [np.zeros((60, 80, 3), dtype=np.uint8),
+                  np.zeros((30, 40, 3), dtype=np.uint8)]
+
+        assert self.detector.detect_batch(frames) == [[], []]
+        assert self.detector.detector_lib.call_count == 2
+
+
+class TestNoopDetector:
+    """Test the noop variant loads no model and finds no faces."""
+
+    def test_detect_returns_no_faces(self):
+        detector = FaceDetector("noop")
+
+        assert detector._kind == DetectorKind.NOOP
+        assert detector.detector_lib is None
+        frame = np.zeros((120, 160, 3), dtype=np.uint8)
+        assert detector.detect(frame) == []
+        assert detector.detect_batch([frame, frame]) == [[], []]
+
+
+def load_detect_worker(detector_config, worker_count=1):
+    """Return the detector a DetectWorker builds from one detector config."""
+    shm = shared_memory.SharedMemory(create=True, size=1024)
+    worker = DetectWorker(None, shm.name, worker_count=worker_count,
+                          detectors=[detector_config])
+    try:
+        worker.load()
+        return worker.face_detector
+    finally:
+        worker.unload()
+        shm.unlink()
+
+
+class TestDetectWorkerConfig:
+    """Test detector settings reach the detector each DetectWorker builds."""
+
+    def test_cache_from_config(self):
+        detector = load_detect_worker(
+            {"type": "face_detector", "variant": "noop", "cache": True})
+
+        assert detector.cache is True
+
+    def test_min_face_px_from_config(self):
+        detector = load_detect_worker(
+            {"type": "face_detector", "variant": "noop", "min_face_px": 160})
+
+        assert detector.min_face_px == 160
+
+    def test_model_settings_from_config(self):
+        detector = load_detect_worker(
+            {"type": "face_detector", "variant": "noop",
+             "model_path": "models/face.onnx", "device": "cuda"},
+            worker_count=4)
+
+        assert detector.model_path == "models/face.onnx"
+        assert detector.device == "cuda"
+        # ONNX Runtime threads are split between this many workers
+        assert detector.worker_count == 4
+
+    def test_grayscale_kept_for_worker_detector(self):
+        """Test the frame worker keeps grayscale only when the detector the
+        detect worker runs accepts it."""
+        detector_config = {"type": "face_detector", "variant": "noop"}
+        preprocessors = [{"type": "grayscale"}]
+
+        detector = load_detect_worker(detector_config)
+        kept = FrameWorker._compatible_preprocessors(preprocessors,
+                                                     [detector_config])
+
+        assert kept == preprocessors
+        assert detector.detect(np.zeros((120, 160), dtype=np.uint8)) == []
+
+    def test_second_face_detector_rejected(self):
+        """Test two face detectors fail instead of sharing the last model."""
+        detectors = [{"type": "face_detector", "variant": "noop"},
+                     {"type": "face_detector", "variant": "noop"}]
+
+        with pytest.raises(ValueError, match="Only one face_detector"):
+            DetectorLoader(detectors).load_model()
@@ -0,0 +1,56 @@
+import pytest
+import numpy as np
+from multiprocessing import shared_memory
+from cvkitworker.ipc.frame_header import (
+    HEADER, PAYLOAD_OFFSET, detector_id, read_frame, write_frame
+)
+
+
+class TestFrameHeader:
+    """Test packing frames into shared memory slots."""
+    
+    def setup_method(self):
+        """Create a shared memory block split into two slots."""
+        self.slot_size = PAYLOAD_OFFSET + 480 * 640 * 3
+        self.shm = shared_memory.SharedMemory(create=True, size=2 * self.slot_size)
+    
+    def teardown_method(self):
+        """Release the shared memory block."""
+        self.shm.close()
+        self.shm.unlink()
+    
+    def test_header_fits_before_payload(self):
+        """Test the packed header does not overlap the pixel data."""
+        assert HEADER.size <= PAYLOAD_OFFSET
+    
+    def test_round_trip_color_frame(self):
+        """Test a BGR frame is read back with its header fields."""
+        frame = np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8)
+        
+        write_frame(self.shm.buf, self.slot_size, 0, frame, 42, 1000)
+        det_id, read, seq, timestamp = read_frame(self.shm.buf, self.slot_size)
+        
+        assert det_id == 0
+        assert seq == 42
+        assert timestamp == 1000
+        assert read.shape == frame.shape
+        assert read.dtype == frame.dtype
+        assert np.array_equal(read, frame)
+        del read
+    
+    def test_round_trip_grayscale_frame(self):
+        """Test a single channel frame keeps its 2D shape."""
+        frame = np.full((240, 320), 7, dtype=np.uint8)
+        
+        write_frame(self.shm.buf, 0, 0, frame, 1, 0)
+        _, read, _, _ = read_frame(self.shm.buf, 0)
+        
+        assert read.shape == (240, 320)
+        assert np.array_equal(read, frame)
+        del read
+    
+    def test_unknown_detector_type(self):
+        """Test unknown detector types are rejected."""
+        assert detector_id("face_detector") == 0
+        with pytest.raises(ValueError):
+            detector_id("object_detector")
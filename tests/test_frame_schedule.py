@@ -0,0 +1,94 @@
+import numpy as np
+from multiprocessing import shared_memory
+from unittest.mock import Mock, patch
+from cvkitworker.detectors.frame_worker import FrameWorker
+
+
+class FakeCapture:
+    """Capture that yields a fixed number of frames at 30 FPS."""
+
+    def __init__(self, frames, clock):
+        self.frames = frames
+        self.clock = clock
+        self.retrieved = 0
+
+    def isOpened(self):
+        return self.frames > 0
+
+    def grab(self):
+        self.frames -= 1
+        self.clock[0] += 1 / 30
+        return True
+
+    def retrieve(self):
+        self.retrieved += 1
+        return True, np.zeros((48, 64, 3), dtype=np.uint8)
+
+    def release(self):
+        pass
+
+
+class TestFrameSchedule:
+    """Test that the producer dispatches at the configured frequency."""
+
+    def setup_method(self):
+        self.config = {
+            "receivers": [],
+            "preprocessors": [],
+            "detectors": [
+                {"type": "face_detector", "name": "face", "frequency_ms": 500}
+            ]
+        }
+        self.shm = shared_memory.SharedMemory(create=True, size=1024 * 1024)
+
+    def teardown_method(self):
+        self.shm.close()
+        self.shm.unlink()
+
+    def _run(self, slot_count):
+        """Run a FrameWorker over 3 s of 30 FPS fake capture and return it
+        with the mock work queue it filled."""
+        clock = [0.0]
+        work_queue = Mock()
+        worker = FrameWorker(self.config, work_queue, self.shm.name, slot_count)
+        worker.video_capture = FakeCapture(90, clock)
+
+        # run() would otherwise bind this process's SIGINT and SIGTERM
+        with patch.object(FrameWorker, "load",
+                             FrameWorker._attach_shared_memory), \
+                patch.object(FrameWorker, "_install_signal_handlers"), \
+                patch("cvkitworker.detectors.frame_worker.time.monotonic_ns",
+                      side_effect=lambda: int(clock[0] * 1e9)), \
+                patch("cvkitworker.detectors.frame_worker.cv2.waitKey",
+                      side_effect=AssertionError("waitKey in headless loop")):
+            worker.run()
+        return worker, work_queue
+
+    def test_frequency_independent_of_capture_rate(self):
+        """Test 2 Hz detection on a 30 FPS stream dispatches 2 frames a second."""
+        worker, work_queue = self._run(4)
+
+        slots = [c.args[0] for c in work_queue.put.call_args_list
+                 if c.args[0] != "STOP"]
+        # Three seconds of video at 2 Hz
+        assert len(slots) == 6
+        # Frames no detector is due for are never decoded
+        assert worker.video_capture.retrieved == 6
+
+    def test_batched_dispatch(self):
+        """Test a detector with batch_size queues full batches of slots."""
+        self.config["detectors"][0]["batch_size"] = 3
+        worker, work_queue = self._run(8)
+
+        batches = [c.args[0] for c in work_queue.put.call_args_list
+                   if c.args[0] != "STOP"]
+        assert batches == [(0, 1, 2), (3, 4, 5)]
+        assert FrameWorker.batch_size(self.config) == 3
+
+    def test_partial_batch_queued_before_stop(self):
+        """Test frames of an unfilled batch are queued when the source ends."""
+        self.config["detectors"][0]["batch_size"] = 4
+        worker, work_queue = self._run(8)
+
+        messages = [c.args[0] for c in work_queue.put.call_args_list]
+        assert messages == [(0, 1, 2, 3), (4, 5), "STOP"]
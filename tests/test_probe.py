@@ -8,40 +8,41 @@ from cvkitworker.utils.probe import FFProbe, VideoInfo, StreamInfo
 from unittest.mock import patch, MagicMock
 
 
+@pytest.fixture(scope="module")
+def sample_video():
+    """Create a simple test video using ffmpeg."""
+    with tempfile.NamedTemporaryFile(suffix='.mp4', delete=False) as f:
+        video_path = f.name
+
+    # Create a 2-second test video with ffmpeg
+    cmd = [
+        "ffmpeg",
+        "-y",  # Overwrite output
+        "-f", "lavfi",
+        "-i", "testsrc=duration=2:size=640x480:rate=30",  # Test pattern
+        "-f", "lavfi", 
+        "-i", "sine=frequency=1000:duration=2",  # Test audio
+        "-c:v", "libx264",
+        "-preset", "ultrafast",
+        "-c:a", "aac",
+        "-b:v", "1M",
+        "-b:a", "128k",
+        video_path
+    ]
+
+    try:
+        subprocess.run(cmd, capture_output=True, check=True)
+        yield video_path
+    finally:
+        Path(video_path).unlink(missing_ok=True)
+
+
 class TestFFProbe:
     @pytest.fixture
     def ffprobe(self):
         """Create FFProbe instance."""
         return FFProbe()
     
-    @pytest.fixture
-    def sample_video(self):
-        """Create a simple test video using ffmpeg."""
-        with tempfile.NamedTemporaryFile(suffix='.mp4', delete=False) as f:
-            video_path = f.name
-        
-        # Create a 2-second test video with ffmpeg
-        cmd = [
-            "ffmpeg",
-            "-y",  # Overwrite output
-            "-f", "lavfi",
-            "-i", "testsrc=duration=2:size=640x480:rate=30",  # Test pattern
-            "-f", "lavfi", 
-            "-i", "sine=frequency=1000:duration=2",  # Test audio
-            "-c:v", "libx264",
-            "-preset", "ultrafast",
-            "-c:a", "aac",
-            "-b:v", "1M",
-            "-b:a", "128k",
-            video_path
-        ]
-        
-        try:
-            subprocess.run(cmd, capture_output=True, check=True)
-            yield video_path
-        finally:
-            Path(video_path).unlink(missing_ok=True)
-    
     @pytest.mark.slow
     def test_probe_video_metadata(self, ffprobe, sample_video):
         """Test extracting metadata from video file."""
@@ -91,6 +92,43 @@ class TestFFProbe:
         assert audio_stream.sample_rate > 0
         assert audio_stream.channels > 0
     
+    def test_probe_cached_until_file_changes(self, tmp_path):
+        """Test local files are probed once until they change."""
+        with patch.object(FFProbe, '_verify_ffprobe'):
+            ffprobe = FFProbe()
+        video = tmp_path / "cached.mp4"
+        video.write_bytes(b"0")
+        output = json.dumps({"format": {"format_name": "mov"}, "streams": []})
+        
+        with patch('subprocess.run') as mock_run:
+            mock_run.return_value = MagicMock(stdout=output)
+            first = ffprobe.probe(str(video))
+            assert ffprobe.probe(str(video)) is first
+            assert mock_run.call_count == 1
+            
+            video.write_bytes(b"00")
+            ffprobe.probe(str(video))
+            assert mock_run.call_count == 2
+    
+    @pytest.mark.slow
+    def test_pyav_backend_matches_ffprobe(self, ffprobe, sample_video):
+        """Test the PyAV backend reports the same metadata as ffprobe."""
+        pytest.importorskip("av")
+        expected = ffprobe.probe(sample_video)
+        info = FFProbe(backend="pyav").probe(sample_video)
+        
+        assert info.nb_streams == expected.nb_streams
+        assert abs(info.duration - expected.duration) < 0.1
+        video, expected_video = (ffprobe.get_primary_video_stream(i) for i in (info, expected))
+        assert video.codec_name == expected_video.codec_name
+        assert (video.width, video.height) == (expected_video.width, expected_video.height)
+        assert video.fps == pytest.approx(expected_video.fps)
+    
+    def test_unknown_backend(self):
+        """Test an unknown backend is rejected."""
+        with pytest.raises(ValueError):
+            FFProbe(backend="gstreamer")
+    
     def test_probe_invalid_file(self, ffprobe):
         """Test probing non-existent file raises error."""
         with pytest.raises(RuntimeError, match="Failed to probe video"):
@@ -1,3 +1,4 @@
+import functools
 import pytest
 import numpy as np
 import cv2
@@ -6,6 +7,14 @@ from cvkitworker.detectors.frame_worker import FrameWorker
 from cvkitworker.preprocessors.image_processing import resize_frame, convert_to_grayscale
 
 
+@functools.lru_cache(maxsize=16)
+def _zero_frame(width, height):
+    """Shared read-only black frame, allocated once per size."""
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    frame.flags.writeable = False
+    return frame
+
+
 class TestResizeAspectRatio:
     """Test the updated resize function that maintains aspect ratio."""
     
@@ -22,7 +31,7 @@ class TestResizeAspectRatio:
     
     def create_test_frame(self, width, height):
         """Create a test frame with specific dimensions."""
-        return np.zeros((height, width, 3), dtype=np.uint8)
+        return _zero_frame(width, height)
     
     def test_resize_width_only(self):
         """Test resizing with only width specified."""
@@ -122,4 +131,81 @@ class TestResizeAspectRatio:
             resized = resize_frame(frame, target_w, None)
             
             assert resized.shape[1] == target_w
-            assert resized.shape[0] == expected_h
\ No newline at end of file
+            assert resized.shape[0] == expected_h
+    
+    def test_resize_into_dst(self):
+        """Test resizing into a given array matches a plain resize."""
+        rng = np.random.default_rng(0)
+        frame = rng.integers(0, 255, (360, 640, 3), dtype=np.uint8)
+        expected = cv2.resize(frame, (320, 180), interpolation=cv2.INTER_AREA)
+        
+        dst = np.empty_like(expected)
+        assert resize_frame(frame, 320, None, dst=dst) is dst
+        np.testing.assert_array_equal(dst, expected)
+    
+    def test_slot_size_from_resize_config(self):
+        """Test shared memory slots are sized from the resize preprocessor."""
+        config = {
+            "preprocessors": [{"type": "resize", "width": 640, "height": 480}],
+            "detectors": [{"type": "face_detector", "scale": 0.5}]
+        }
+        # Detector scales below 1 never grow the frame
+        assert FrameWorker.slot_size(config) == 64 + 640 * 480 * 3
+        
+        config["detectors"][0]["scale"] = 2.0
+        assert FrameWorker.slot_size(config) == 64 + 1280 * 960 * 3
+    
+    def test_slot_size_width_only(self):
+        """Test a width-only resize bounds the height by the aspect ratio."""
+        config = {"preprocessors": [{"type": "resize", "width": 900}]}
+        assert FrameWorker.slot_size(config) == 64 + 1600 * 900 * 3
+    
+    def test_slot_size_from_source(self, tmp_path):
+        """Test slots hold a source larger than the default bound when no
+        resize preprocessor is configured."""
+        video_path = str(tmp_path / 'large.mp4')
+        writer = cv2.VideoWriter(video_path, cv2.VideoWriter_fourcc(*'mp4v'),
+                                 25, (2560, 1440))
+        writer.write(np.zeros((1440, 2560, 3), dtype=np.uint8))
+        writer.release()
+        
+        shape = FrameWorker.source_shape(
+            [{"type": "file", "source": video_path}])
+        
+        assert shape == (1440, 2560, 3)
+        assert FrameWorker.slot_size({}, shape) == 64 + 1440 * 2560 * 3
+        # A resize step still bounds the slot below the source size
+        config = {"preprocessors": [{"type": "resize", "width": 640, "height": 480}]}
+        assert FrameWorker.slot_size(config, shape) == 64 + 640 * 480 * 3
+    
+    def test_source_shape_unavailable(self, tmp_path):
+        """Test an unopenable source leaves slot sizing to the default."""
+        shape = FrameWorker.source_shape(
+            [{"type": "file", "source": str(tmp_path / 'missing.mp4')}])
+        
+        assert shape is None
+    
+    def test_preprocess_frame_reuses_buffers(self):
+        """Test repeated frames are resized into the same output array."""
+        self.frame_worker.preprocessors = [
+            {"name": "resize", "type": "resize", "width": 320},
+            {"name": "grayscale", "type": "grayscale"}
+        ]
+        
+        first = self.frame_worker.preprocess_frame(self.create_test_frame(640, 480))
+        second = self.frame_worker.preprocess_frame(self.create_test_frame(640, 480))
+        
+        assert first.shape == (240, 320)
+        assert first is second
+    
+    def test_grayscale_skipped_for_color_detectors(self):
+        """Test grayscale preprocessing is dropped when a detector needs color."""
+        preprocessors = [{"type": "resize", "width": 320}, {"type": "grayscale"}]
+        
+        color = FrameWorker._compatible_preprocessors(
+            preprocessors, [{"type": "face_detector", "variant": "opencv_dnn"}])
+        gray = FrameWorker._compatible_preprocessors(
+            preprocessors, [{"type": "face_detector", "variant": "dlib"}])
+        
+        assert [p["type"] for p in color] == ["resize"]
+        assert gray == preprocessors
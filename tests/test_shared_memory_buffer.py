@@ -0,0 +1,223 @@
+import numpy as np
+import pytest
+from concurrent.futures import ProcessPoolExecutor
+from cvkitworker.utils.shared_buffer import SharedMemoryCircularBuffer
+
+
+def _worker(name):
+    """Write a frame of ones in place into a buffer attached by name."""
+    buf = SharedMemoryCircularBuffer(name=name, create=False)
+    try:
+        with buf.reserve_slot() as frame:
+            frame[...] = 1
+        return len(buf)
+    finally:
+        buf.close()
+
+
+@pytest.fixture(scope="module")
+def worker_pool():
+    """One worker process shared by the tests that attach from another process."""
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        yield pool
+
+
+class TestSharedMemoryCircularBuffer:
+    """Test the shared memory frame ring."""
+
+    def setup_method(self):
+        self.buffers = []
+
+    def teardown_method(self):
+        for buf in self.buffers:
+            buf.close()
+            buf.unlink()
+
+    def make_buffer(self, shape, capacity, dtype=np.uint8, layout="HWC"):
+        buf = SharedMemoryCircularBuffer(shape, dtype, capacity, layout=layout)
+        self.buffers.append(buf)
+        return buf
+
+    def test_append_and_get_last(self):
+        buf = self.make_buffer((4, 6, 3), capacity=4)
+        assert buf.get_last() is None
+
+        f1 = np.full((4, 6, 3), 7, dtype=np.uint8)
+        f2 = np.full((4, 6, 3), 9, dtype=np.uint8)
+        buf.append(f1)
+        assert np.array_equal(buf.get_last(), f1)
+        buf.append(f2)
+        assert np.array_equal(buf.get_last(), f2)
+
+    def test_overwrite_and_get_all(self):
+        buf = self.make_buffer((1, 1, 1), capacity=3)
+        for i in range(5):
+            buf.append(np.full((1, 1, 1), i, dtype=np.uint8))
+
+        frames = buf.get_all()
+        assert [int(f[0, 0, 0]) for f in frames] == [2, 3, 4]
+        assert buf.is_full
+
+    def test_reserve_slot(self):
+        buf = self.make_buffer((2, 2, 3), capacity=2)
+        with buf.reserve_slot() as frame:
+            assert np.shares_memory(frame, buf.buffer)
+            assert len(buf) == 0
+            frame[...] = 4
+        assert len(buf) == 1
+        assert np.array_equal(buf.get_last(), np.full((2, 2, 3), 4, np.uint8))
+
+        # A failed write is not published
+        with pytest.raises(RuntimeError):
+            with buf.reserve_slot() as frame:
+                frame[...] = 5
+                raise RuntimeError
+        assert len(buf) == 1
+        assert int(buf.get_last()[0, 0, 0]) == 4
+
+    def test_process_pool_access(self, worker_pool):
+        shape = (2, 2, 3)
+        buf = self.make_buffer(shape, capacity=4)
+
+        count = worker_pool.submit(_worker, buf.name).result()
+
+        assert count == 1
+        assert np.array_equal(buf.get_last(), np.ones(shape, dtype=np.uint8))
+
+    def test_pythonic_features(self):
+        buf = self.make_buffer((1, 1, 1), capacity=3)
+        assert len(buf) == 0
+        for i in range(4):
+            buf.append(np.full((1, 1, 1), i, dtype=np.uint8))
+
+        assert len(buf) == 3
+        assert int(buf[0][0, 0, 0]) == 1
+        assert int(buf[-1][0, 0, 0]) == 3
+        with pytest.raises(IndexError):
+            buf[3]
+        assert [int(f[0, 0, 0]) for f in buf] == [1, 2, 3]
+
+    def test_views(self):
+        buf = self.make_buffer((1, 1, 1), capacity=2)
+        for i in range(3):
+            buf.append(np.full((1, 1, 1), i, dtype=np.uint8))
+
+        views = buf.get_all_view()
+        assert [int(v[0, 0, 0]) for v in views] == [1, 2]
+        assert np.shares_memory(buf.view(-1), buf.buffer)
+        with pytest.raises(ValueError):
+            views[0][0, 0, 0] = 9
+        with pytest.raises(IndexError):
+            buf.view(2)
+
+        # Views follow the slot once the writer wraps around to it
+        for i in range(3, 6):
+            buf.append(np.full((1, 1, 1), i, dtype=np.uint8))
+        assert int(views[0][0, 0, 0]) == 5
+
+    def test_get_all_without_copy(self):
+        buf = self.make_buffer((1, 1, 1), capacity=3)
+        assert buf.get_all(copy=False) == []
+
+        # Six appends over four slots leave the frames wrapped around the end
+        for i in range(6):
+            buf.append(np.full((1, 1, 1), i, dtype=np.uint8))
+        frames = buf.get_all(copy=False)
+        assert [int(f[0, 0, 0]) for f in frames] == [3, 4, 5]
+        assert all(np.shares_memory(f, buf.buffer) for f in frames)
+        assert not any(f.flags.writeable for f in frames)
+        assert not np.shares_memory(buf.get_all()[0], buf.buffer)
+
+    def test_slots_rounded_to_power_of_two(self):
+        buf = self.make_buffer((1, 1, 1), capacity=5)
+        assert buf.capacity == 5
+        assert len(buf.buffer) == 8
+        assert len(self.make_buffer((1, 1, 1), capacity=4).buffer) == 8
+        for i in range(11):
+            buf.append(np.full((1, 1, 1), i, dtype=np.uint8))
+        assert [int(f[0, 0, 0]) for f in buf] == [6, 7, 8, 9, 10]
+
+        other = SharedMemoryCircularBuffer((1, 1, 1), np.uint8, name=buf.name,
+                                           create=False)
+        try:
+            assert other.capacity == 5
+            assert int(other.get_last()[0, 0, 0]) == 10
+        finally:
+            other.close()
+
+    def test_view_last_zero_copy(self):
+        buf = self.make_buffer((4, 6, 3), capacity=2)
+        assert buf.view_last() is None
+
+        frame = np.full((4, 6, 3), 5, dtype=np.uint8)
+        buf.append(frame)
+        last = buf.view_last()
+        assert np.array_equal(last, frame)
+        assert not last.flags.writeable
+        assert np.shares_memory(last, buf.buffer)
+
+    def test_chw_layout(self):
+        shape = (4, 6, 3)
+        buf = self.make_buffer(shape, capacity=3, layout="CHW")
+        rng = np.random.default_rng(0)
+        frames = [rng.integers(0, 255, shape, dtype=np.uint8) for _ in range(5)]
+        for frame in frames:
+            buf.append(frame)
+
+        # Frames round-trip as HWC while each slot holds channel planes
+        assert buf.buffer.shape[1:] == (3, 4, 6)
+        assert all(np.array_equal(a, b) for a, b in zip(buf.get_all(), frames[2:]))
+        assert np.array_equal(buf.get_last(), frames[-1])
+
+        plane = buf.get_last_plane(1)
+        assert plane.flags.c_contiguous
+        assert np.shares_memory(plane, buf.buffer)
+        assert np.array_equal(plane, frames[-1][..., 1])
+
+    def test_read_retries_when_lapped(self):
+        buf = self.make_buffer((1, 1, 1), capacity=3)
+        for i in range(3):
+            buf.append(np.full((1, 1, 1), i, dtype=np.uint8))
+        assert buf.seq == 3
+
+        attempts = []
+
+        def read(seq):
+            attempts.append(seq)
+            if len(attempts) == 1:
+                # The writer laps the oldest frame while it is being read
+                for i in range(3, 5):
+                    buf.append(np.full((1, 1, 1), i, dtype=np.uint8))
+            return int(buf.buffer[(seq - 3) & 3][0, 0, 0])
+
+        assert buf._read(3, read) == 2
+        assert attempts == [3, 5]
+
+    def test_attach_reads_header(self):
+        buf = self.make_buffer((4, 6, 3), capacity=3, dtype=np.float32,
+                               layout="CHW")
+        other = SharedMemoryCircularBuffer(name=buf.name, create=False)
+        try:
+            assert other.frame_shape == (4, 6, 3)
+            assert other.dtype == np.float32
+            assert other.capacity == 3
+            assert other.layout == "CHW"
+            assert other.buffer.shape == buf.buffer.shape
+        finally:
+            other.close()
+
+        with pytest.raises(ValueError):
+            SharedMemoryCircularBuffer((4, 6, 1), name=buf.name, create=False)
+        with pytest.raises(ValueError):
+            SharedMemoryCircularBuffer(dtype=np.uint8, name=buf.name,
+                                       create=False)
+
+    def test_invalid_capacity(self):
+        with pytest.raises(ValueError):
+            SharedMemoryCircularBuffer((1, 1, 1), np.uint8, 0)
+
+    def test_invalid_layout(self):
+        with pytest.raises(ValueError):
+            SharedMemoryCircularBuffer((1, 1, 1), np.uint8, 1, layout="NHWC")
+        with pytest.raises(ValueError):
+            SharedMemoryCircularBuffer((4, 4), np.uint8, 1, layout="CHW")
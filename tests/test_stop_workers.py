@@ -0,0 +1,39 @@
+import signal
+import time
+from multiprocessing import Process
+
+import cvkitworker.__main__ as main
+
+
+def _ignore_sigterm():
+    """Worker stand-in that only a kill stops."""
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    while True:
+        time.sleep(0.1)
+
+
+def _sleep():
+    """Worker stand-in that SIGTERM stops."""
+    time.sleep(60)
+
+
+class TestStopWorkers:
+    """Test stop_workers() leaves no worker process running."""
+
+    def test_kills_workers_ignoring_sigterm(self, monkeypatch):
+        stubborn = Process(target=_ignore_sigterm, daemon=True)
+        idle = Process(target=_sleep, daemon=True)
+        stubborn.start()
+        idle.start()
+        # Let the workers install their handlers before they are signalled
+        time.sleep(0.2)
+        monkeypatch.setattr(main, "producer", stubborn)
+        monkeypatch.setattr(main, "consumers", [idle])
+
+        main.stop_workers()
+
+        assert not stubborn.is_alive()
+        assert stubborn.exitcode == -signal.SIGKILL
+        assert idle.exitcode == -signal.SIGTERM
+        assert main.producer is None
+        assert main.consumers == []
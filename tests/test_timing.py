@@ -4,17 +4,13 @@ Test cases for timing measurement functionality.
 """
 
 import unittest
+import multiprocessing
 import os
 import json
 import tempfile
 import time
 import numpy as np
-from pathlib import Path
 from unittest.mock import patch, MagicMock
-import sys
-
-# Add src to path
-sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
 
 from cvkitworker.utils.timing import (
     TimingManager,
@@ -25,20 +21,38 @@ from cvkitworker.utils.timing import (
     measure_face_detection,
     measure_color_conversion,
     measure_scaling,
+    flush_timing,
     get_timing_manager
 )
 
 
-class TestTimingStorage(unittest.TestCase):
-    """Test timing storage implementations."""
+def _record_in_child():
+    """Record one measurement in a worker process and flush it before exit."""
+    get_timing_manager().record_timing('child_function', 2.0)
+    flush_timing()
+
+
+class TimingFileTestCase(unittest.TestCase):
+    """Share one temporary directory per test class for the timing file."""
+    
+    @classmethod
+    def setUpClass(cls):
+        cls._temp_dir = tempfile.TemporaryDirectory()
+        cls.temp_dir = cls._temp_dir.name
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls._temp_dir.cleanup()
     
     def setUp(self):
-        self.temp_dir = tempfile.mkdtemp()
+        # Each test starts without a timing file
         self.temp_file = os.path.join(self.temp_dir, 'test_timing.jsonl')
-    
-    def tearDown(self):
-        import shutil
-        shutil.rmtree(self.temp_dir, ignore_errors=True)
+        if os.path.exists(self.temp_file):
+            os.remove(self.temp_file)
+
+
+class TestTimingStorage(TimingFileTestCase):
+    """Test timing storage implementations."""
     
     def test_file_timing_storage(self):
         """Test file-based timing storage."""
@@ -83,6 +97,25 @@ class TestTimingStorage(unittest.TestCase):
         self.assertEqual(parsed2['function'], 'another_func')
         self.assertEqual(parsed2['duration_ms'], 25.3)
     
+    def test_file_timing_storage_buffers_until_flush(self):
+        """Test measurements are written in one batch on flush."""
+        storage = FileTimingStorage(self.temp_file)
+        
+        for i in range(3):
+            storage.store_timing({'function': 'buffered', 'duration_ms': float(i)})
+        self.assertFalse(os.path.exists(self.temp_file))
+        
+        storage.flush()
+        with open(self.temp_file, 'r') as f:
+            durations = [json.loads(line)['duration_ms'] for line in f]
+        self.assertEqual(durations, [0.0, 1.0, 2.0])
+        
+        # Appends go to the end of the existing file
+        storage.store_timing({'function': 'buffered', 'duration_ms': 3.0})
+        storage.close()
+        with open(self.temp_file, 'r') as f:
+            self.assertEqual(len(f.readlines()), 4)
+    
     def test_database_timing_storage_placeholder(self):
         """Test database storage placeholder."""
         storage = DatabaseTimingStorage("test_connection")
@@ -116,21 +149,17 @@ class TestTimingStorage(unittest.TestCase):
         storage.close()
 
 
-class TestTimingManager(unittest.TestCase):
+class TestTimingManager(TimingFileTestCase):
     """Test timing manager functionality."""
     
     def setUp(self):
-        self.temp_dir = tempfile.mkdtemp()
-        self.temp_file = os.path.join(self.temp_dir, 'test_timing.jsonl')
+        super().setUp()
         
         # Clear any existing global timing manager
         import cvkitworker.utils.timing
         cvkitworker.utils.timing._timing_manager = None
     
     def tearDown(self):
-        import shutil
-        shutil.rmtree(self.temp_dir, ignore_errors=True)
-        
         # Clear environment variables
         for key in ['CVKIT_TIMING_ENABLED', 'CVKIT_TIMING_STORAGE', 'CVKIT_TIMING_FILE']:
             if key in os.environ:
@@ -188,6 +217,58 @@ class TestTimingManager(unittest.TestCase):
         self.assertEqual(measurement['context']['test'], 'data')
         self.assertEqual(measurement['process_id'], os.getpid())
     
+    def test_timing_record_ns(self):
+        """Test recording a measurement from perf_counter_ns readings."""
+        os.environ['CVKIT_TIMING_ENABLED'] = 'true'
+        os.environ['CVKIT_TIMING_FILE'] = self.temp_file
+        
+        manager = TimingManager()
+        manager.record_timing_ns('test_function', 1_000_000, 3_500_000)
+        manager.flush()
+        
+        with open(self.temp_file, 'r') as f:
+            measurement = json.loads(f.readline())
+        self.assertEqual(measurement['duration_ms'], 2.5)
+        self.assertEqual(measurement['process_id'], os.getpid())
+    
+    def test_timing_record_reuses_measurement(self):
+        """Test each record refills one dict, which file storage serializes
+        before the next record overwrites it."""
+        os.environ['CVKIT_TIMING_ENABLED'] = 'true'
+        os.environ['CVKIT_TIMING_FILE'] = self.temp_file
+        
+        manager = TimingManager()
+        with patch.object(manager.storage, 'store_timing',
+                          wraps=manager.storage.store_timing) as store:
+            manager.record_timing('first', 1.0)
+            manager.record_timing('second', 2.0)
+        manager.flush()
+        
+        # The contract of TimingStorage.store_timing(): the dict is reused
+        first, second = (c.args[0] for c in store.call_args_list)
+        self.assertIs(first, second)
+        with open(self.temp_file, 'r') as f:
+            functions = [json.loads(line)['function'] for line in f]
+        self.assertEqual(functions, ['first', 'second'])
+    
+    @unittest.skipUnless(hasattr(os, 'fork'), "needs fork")
+    def test_forked_worker_flushes_own_measurements(self):
+        """Test a forked worker writes its own measurements, not the parent's."""
+        os.environ['CVKIT_TIMING_ENABLED'] = 'true'
+        os.environ['CVKIT_TIMING_FILE'] = self.temp_file
+        
+        manager = get_timing_manager()
+        manager.record_timing('parent_function', 1.0)
+        
+        process = multiprocessing.get_context('fork').Process(target=_record_in_child)
+        process.start()
+        process.join()
+        manager.flush()
+        
+        with open(self.temp_file, 'r') as f:
+            functions = [json.loads(line)['function'] for line in f]
+        self.assertEqual(sorted(functions), ['child_function', 'parent_function'])
+    
     def test_timing_no_record_when_disabled(self):
         """Test no recording when disabled."""
         os.environ['CVKIT_TIMING_ENABLED'] = 'false'
@@ -228,12 +309,11 @@ class TestTimingManager(unittest.TestCase):
         self.assertIsInstance(manager.storage, TelemetryTimingStorage)
 
 
-class TestTimingDecorators(unittest.TestCase):
+class TestTimingDecorators(TimingFileTestCase):
     """Test timing decorator functionality."""
     
     def setUp(self):
-        self.temp_dir = tempfile.mkdtemp()
-        self.temp_file = os.path.join(self.temp_dir, 'test_timing.jsonl')
+        super().setUp()
         
         # Enable timing
         os.environ['CVKIT_TIMING_ENABLED'] = 'true'
@@ -244,9 +324,6 @@ class TestTimingDecorators(unittest.TestCase):
         cvkitworker.utils.timing._timing_manager = None
     
     def tearDown(self):
-        import shutil
-        shutil.rmtree(self.temp_dir, ignore_errors=True)
-        
         # Clear environment variables
         for key in ['CVKIT_TIMING_ENABLED', 'CVKIT_TIMING_STORAGE', 'CVKIT_TIMING_FILE']:
             if key in os.environ:
@@ -395,6 +472,16 @@ class TestTimingDecorators(unittest.TestCase):
         # No timing file should be created
         self.assertFalse(os.path.exists(self.temp_file))
     
+    def test_timing_disabled_returns_function_unwrapped(self):
+        """Test decorating with timing switched off leaves the function as is."""
+        os.environ['CVKIT_TIMING_ENABLED'] = 'false'
+        
+        def test_func():
+            return "result"
+        
+        self.assertIs(measure_timing("disabled_test")(test_func), test_func)
+        self.assertIs(measure_scaling(test_func), test_func)
+    
     def test_exception_handling_in_timing(self):
         """Test timing decorator handles exceptions properly."""
         @measure_timing("exception_test")
@@ -417,12 +504,11 @@ class TestTimingDecorators(unittest.TestCase):
         self.assertGreater(measurement['duration_ms'], 0)
 
 
-class TestIntegrationWithCV(unittest.TestCase):
+class TestIntegrationWithCV(TimingFileTestCase):
     """Test integration with actual CV functions."""
     
     def setUp(self):
-        self.temp_dir = tempfile.mkdtemp()
-        self.temp_file = os.path.join(self.temp_dir, 'test_timing.jsonl')
+        super().setUp()
         
         # Enable timing
         os.environ['CVKIT_TIMING_ENABLED'] = 'true'
@@ -433,9 +519,6 @@ class TestIntegrationWithCV(unittest.TestCase):
         cvkitworker.utils.timing._timing_manager = None
     
     def tearDown(self):
-        import shutil
-        shutil.rmtree(self.temp_dir, ignore_errors=True)
-        
         # Clear environment variables
         for key in ['CVKIT_TIMING_ENABLED', 'CVKIT_TIMING_STORAGE', 'CVKIT_TIMING_FILE']:
             if key in os.environ:
@@ -490,6 +573,20 @@ class TestIntegrationWithCV(unittest.TestCase):
             
         except ImportError:
             self.skipTest("FaceDetector not available for testing")
+    
+    def test_detect_batch_timed_once(self):
+        """Test a batch falling back to per-frame detection is one measurement."""
+        from cvkitworker.detectors.detectors.face_detect import FaceDetector
+        
+        detector = FaceDetector("noop")
+        frame = np.zeros((120, 160, 3), dtype=np.uint8)
+        detector.detect_batch([frame, frame, frame])
+        get_timing_manager().flush()
+        
+        with open(self.temp_file, 'r') as f:
+            measurements = [json.loads(line) for line in f]
+        functions = [m['function'] for m in measurements]
+        self.assertEqual(functions.count('face_detection'), 1)
 
 
 if __name__ == '__main__':
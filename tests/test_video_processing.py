@@ -1,422 +1,312 @@
 #!/usr/bin/env python3
 """
 Test cases for video file processing functionality.
+
+The pipeline runs in the test process through run_pipeline() and stops after
+a fixed number of frames, instead of starting ``python -m cvkitworker`` and
+killing it after a timeout.
 """
 
-import unittest
 import os
 import json
-import tempfile
-import time
-import subprocess
-import sys
+import re
+import cv2
+import numpy as np
 import pytest
 from pathlib import Path
-from unittest.mock import patch
-import threading
-import signal
+from loguru import logger
+
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+REPO_ROOT = Path(__file__).parent.parent
+
+import cvkitworker.utils.timing
+from cvkitworker.__main__ import run_pipeline
+from cvkitworker.config.parse_config import ConfigParser
+
+VIDEO_PATH = REPO_ROOT / 'test_videos' / 'big_buck_bunny_480p.mp4'
+
+# Frames the frame worker reads before the pipeline stops
+MAX_FRAMES = 30
+# Enough for tests that only check startup logging; every startup message is
+# written before the first frame is read
+STARTUP_FRAMES = 2
+
+
+def indicator_pattern(*indicators):
+    """Compile indicators into one case-insensitive alternation."""
+    return re.compile('|'.join(map(re.escape, indicators)), re.IGNORECASE)
+
 
-# Add src to path
-sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+def find_indicators(pattern, output):
+    """Return the distinct indicators found in output, in one pass."""
+    return {match.group(0).lower() for match in pattern.finditer(output)}
+
+
+PROCESSING_INDICATORS = indicator_pattern(
+    'Loaded video file',
+    'FrameWorker started',
+    'Frame shape:',
+    'face detector',
+    'DetectWorker started'
+)
+
+FILE_FLAG_INDICATORS = indicator_pattern(
+    'video file',
+    'FrameWorker started',
+    VIDEO_PATH.name
+)
+
+
+def build_config(timing_log_path):
+    """Return the pipeline config the tests run, logging timing to timing_log_path."""
+    return {
+        "receivers": [
+            {
+                "name": "video_test",
+                "type": "file",
+                "source": str(VIDEO_PATH)
+            }
+        ],
+        "preprocessors": [
+            {
+                "name": "resize",
+                "type": "resize",
+                "width": 320,
+                "height": 240
+            }
+        ],
+        "detectors": [
+            {
+                "name": "face_detector",
+                "type": "face_detector",
+                "variant": "noop",
+                "frequency_ms": 200,
+                "scale": 1.0,
+                "device": "cpu"
+            }
+        ],
+        "timing": {
+            "enabled": True,
+            "storage": "file",
+            "file_path": str(timing_log_path),
+            "include_args": True,
+            "include_results": True
+        }
+    }
+
+
+def write_synthetic_video(path, frame_count=10, width=320, height=240):
+    """Write a short video of moving noise so tests need no downloaded file."""
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*'mp4v'),
+                             25, (width, height))
+    rng = np.random.default_rng(0)
+    for _ in range(frame_count):
+        writer.write(rng.integers(0, 256, (height, width, 3), dtype=np.uint8))
+    writer.release()
+
+
+def run_logged_pipeline(config, log_path, max_frames=MAX_FRAMES, check=True):
+    """Run the pipeline on a config and return its exit code and everything
+    logged meanwhile.
+
+    With check set, a non-zero exit code (any worker failing) fails the test.
+    """
+    # A file sink is inherited by forked worker processes, so their
+    # messages land in the same log
+    sink_id = logger.add(log_path, level="INFO")
+    try:
+        exit_code = run_pipeline(ConfigParser(config=config),
+                                 num_detect_workers=1,
+                                 max_frames=max_frames)
+    finally:
+        logger.remove(sink_id)
+    output = Path(log_path).read_text()
+    if check:
+        assert exit_code == 0, f"Pipeline exited with {exit_code}:\n{output}"
+    return exit_code, output
+
+
+@pytest.fixture
+def run_logged(tmp_path):
+    """Return run_logged_pipeline() logging into the test's tmp_path."""
+    def run(config, max_frames=MAX_FRAMES, check=True):
+        return run_logged_pipeline(config, tmp_path / 'pipeline.log',
+                                   max_frames, check)
+    return run
+
+
+@pytest.fixture(scope="module")
+def pipeline_run(tmp_path_factory):
+    """Run the pipeline once with timing enabled for the tests that only
+    inspect its log and timing measurements.
+
+    The run must succeed and write a timing file; ``timing`` holds its
+    parsed measurements.
+    """
+    tmp = tmp_path_factory.mktemp("run")
+    timing_log_path = tmp / 'video_timing.jsonl'
+    with pytest.MonkeyPatch.context() as mp:
+        # Workers build their own timing manager from the environment
+        mp.setenv('CVKIT_TIMING_ENABLED', 'true')
+        mp.setenv('CVKIT_TIMING_FILE', str(timing_log_path))
+        mp.setattr(cvkitworker.utils.timing, '_timing_manager', None)
+        exit_code, output = run_logged_pipeline(build_config(timing_log_path),
+                                                tmp / 'pipeline.log')
+
+    assert timing_log_path.exists(), f"No timing file written:\n{output}"
+    # Parse the whole log in one pass; storage writes whole lines
+    timing = [json_loads(line)
+              for line in timing_log_path.read_bytes().splitlines()
+              if line.strip()]
+    return {"exit_code": exit_code, "output": output, "timing": timing}
 
 
 @pytest.mark.integration
 @pytest.mark.video
 @pytest.mark.slow
-class TestVideoProcessing(unittest.TestCase):
+class TestVideoProcessing:
     """Test video file input and processing."""
-    
-    def setUp(self):
-        self.temp_dir = tempfile.mkdtemp()
-        self.video_path = Path(__file__).parent.parent / 'test_videos' / 'big_buck_bunny_480p.mp4'
+
+    @pytest.fixture(autouse=True)
+    def setup_config(self, tmp_path):
+        self.temp_dir = str(tmp_path)
+        self.video_path = VIDEO_PATH
         self.config_path = os.path.join(self.temp_dir, 'test_video_config.json')
         self.timing_log_path = os.path.join(self.temp_dir, 'video_timing.jsonl')
-        
+
         # Create test configuration for video processing
-        self.test_config = {
-            "receivers": [
-                {
-                    "name": "video_test",
-                    "type": "file",
-                    "source": str(self.video_path)
-                }
-            ],
-            "preprocessors": [
-                {
-                    "name": "resize",
-                    "type": "resize",
-                    "width": 320,
-                    "height": 240
-                }
-            ],
-            "detectors": [
-                {
-                    "name": "face_detector",
-                    "type": "face_detector",
-                    "variant": "dlib",
-                    "frequency_ms": 200,
-                    "scale": 1.0,
-                    "device": "cpu"
-                }
-            ],
-            "timing": {
-                "enabled": True,
-                "storage": "file",
-                "file_path": self.timing_log_path,
-                "include_args": True,
-                "include_results": True
-            }
-        }
-        
+        self.test_config = build_config(self.timing_log_path)
+
         # Write test configuration file
         with open(self.config_path, 'w') as f:
-            json.dump(self.test_config, f, indent=2)
-    
-    def tearDown(self):
-        import shutil
-        shutil.rmtree(self.temp_dir, ignore_errors=True)
-    
+            f.write(json.dumps(self.test_config, indent=2))
+
     def test_video_file_exists(self):
         """Test that the test video file exists and is accessible."""
-        self.assertTrue(self.video_path.exists(), f"Test video not found: {self.video_path}")
-        self.assertTrue(self.video_path.is_file(), f"Test video is not a file: {self.video_path}")
-        self.assertGreater(self.video_path.stat().st_size, 1000, "Test video file is too small")
-    
+        assert self.video_path.exists(), f"Test video not found: {self.video_path}"
+        assert self.video_path.is_file(), f"Test video is not a file: {self.video_path}"
+        assert self.video_path.stat().st_size > 1000, "Test video file is too small"
+
     def test_video_config_generation(self):
         """Test video configuration generation and validation."""
         # Verify config file was created correctly
-        self.assertTrue(os.path.exists(self.config_path))
-        
+        assert os.path.exists(self.config_path)
+
         with open(self.config_path, 'r') as f:
-            config = json.load(f)
-        
+            config = json_loads(f.read())
+
         # Verify configuration structure
-        self.assertIn('receivers', config)
-        self.assertIn('detectors', config)
-        self.assertIn('timing', config)
-        
+        assert 'receivers' in config
+        assert 'detectors' in config
+        assert 'timing' in config
+
         # Verify receiver configuration
         receiver = config['receivers'][0]
-        self.assertEqual(receiver['type'], 'file')
-        self.assertEqual(receiver['source'], str(self.video_path))
-        
+        assert receiver['type'] == 'file'
+        assert receiver['source'] == str(self.video_path)
+
         # Verify timing is enabled
-        self.assertTrue(config['timing']['enabled'])
-        self.assertEqual(config['timing']['file_path'], self.timing_log_path)
-    
-    def test_video_processing_with_logs(self):
+        assert config['timing']['enabled']
+        assert config['timing']['file_path'] == self.timing_log_path
+
+    def test_video_processing_with_logs(self, pipeline_run):
         """Test video processing and verify appropriate log entries."""
-        # Set up environment for timing
-        env = os.environ.copy()
-        env['CVKIT_TIMING_ENABLED'] = 'true'
-        env['CVKIT_TIMING_FILE'] = self.timing_log_path
-        env['PYTHONPATH'] = str(Path(__file__).parent.parent / 'src')
-        
-        # Run video processing for a limited time
-        cmd = [
-            sys.executable, '-m', 'cvkitworker',
-            '--config', self.config_path
-        ]
-        
-        # Start the process
-        process = subprocess.Popen(
-            cmd,
-            env=env,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            cwd=str(Path(__file__).parent.parent)
-        )
-        
-        try:
-            # Let it run for a shorter time to process some frames
-            stdout, stderr = process.communicate(timeout=4)
-            
-        except subprocess.TimeoutExpired:
-            # Expected - terminate the process after timeout
-            process.terminate()
-            try:
-                stdout, stderr = process.communicate(timeout=1)
-            except subprocess.TimeoutExpired:
-                process.kill()
-                stdout, stderr = process.communicate()
-        
-        # Capture the output for analysis
-        output_lines = stdout.split('\n') if stdout else []
-        error_lines = stderr.split('\n') if stderr else []
-        
+        output = pipeline_run["output"]
+
         # Verify basic video processing started
-        video_loaded = any('Loaded video file' in line for line in output_lines + error_lines)
-        frame_worker_started = any('FrameWorker started' in line for line in output_lines + error_lines)
-        
-        # Print debug information if test fails
-        if not (video_loaded or frame_worker_started):
-            print(f"STDOUT:\n{stdout}")
-            print(f"STDERR:\n{stderr}")
-            print(f"Video path: {self.video_path}")
-            print(f"Config path: {self.config_path}")
-        
-        self.assertTrue(
-            video_loaded or frame_worker_started,
-            "Video processing did not start properly. Check stdout/stderr above."
-        )
-    
-    def test_timing_measurements_created(self):
+        video_loaded = 'Loaded video file' in output
+        frame_worker_started = 'FrameWorker started' in output
+
+        assert video_loaded or frame_worker_started, (
+            f"Video processing did not start properly. Output:\n{output}")
+
+    def test_timing_measurements_created(self, pipeline_run):
         """Test that timing measurements are properly created during video processing."""
-        # Set up environment for timing
-        env = os.environ.copy()
-        env['CVKIT_TIMING_ENABLED'] = 'true'
-        env['CVKIT_TIMING_FILE'] = self.timing_log_path
-        env['PYTHONPATH'] = str(Path(__file__).parent.parent / 'src')
-        
-        # Run video processing for a short time
-        cmd = [
-            sys.executable, '-m', 'cvkitworker',
-            '--config', self.config_path
-        ]
-        
-        process = subprocess.Popen(
-            cmd,
-            env=env,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            cwd=str(Path(__file__).parent.parent)
-        )
-        
-        try:
-            # Let it run for a shorter time
-            stdout, stderr = process.communicate(timeout=3)
-        except subprocess.TimeoutExpired:
-            process.terminate()
-            try:
-                stdout, stderr = process.communicate(timeout=1)
-            except subprocess.TimeoutExpired:
-                process.kill()
-                stdout, stderr = process.communicate()
-        
-        # Check if timing file was created
-        if os.path.exists(self.timing_log_path):
-            with open(self.timing_log_path, 'r') as f:
-                timing_lines = f.readlines()
-            
-            # Verify timing measurements exist
-            self.assertGreater(len(timing_lines), 0, "No timing measurements recorded")
-            
-            # Parse and verify timing entries
-            measurements = []
-            for line in timing_lines:
-                if line.strip():
-                    try:
-                        measurement = json.loads(line)
-                        measurements.append(measurement)
-                    except json.JSONDecodeError:
-                        continue
-            
-            self.assertGreater(len(measurements), 0, "No valid timing measurements found")
-            
-            # Verify measurement structure
-            for measurement in measurements[:3]:  # Check first few measurements
-                self.assertIn('timestamp', measurement)
-                self.assertIn('function', measurement)
-                self.assertIn('duration_ms', measurement)
-                self.assertIn('process_id', measurement)
-                self.assertIsInstance(measurement['duration_ms'], (int, float))
-                self.assertGreater(measurement['duration_ms'], 0)
-            
-            # Look for specific CV operations
-            function_names = [m['function'] for m in measurements]
-            
-            # Should have some frame processing or face detection operations
-            cv_operations = [
-                'face_detection',
-                'frame_processing', 
-                'scaling',
-                'color_conversion'
-            ]
-            
-            found_cv_ops = [op for op in cv_operations if op in function_names]
-            self.assertGreater(
-                len(found_cv_ops), 0,
-                f"No CV operations found in timing logs. Functions recorded: {set(function_names)}"
-            )
-            
-        else:
-            # If no timing file, check if the process at least started
-            self.assertIn(
-                'video', stdout.lower() + stderr.lower(),
-                f"Video processing did not start. Output: {stdout}\nErrors: {stderr}"
-            )
-    
-    def test_video_processing_frame_detection(self):
+        measurements = pipeline_run["timing"]
+
+        assert len(measurements) > 0, "No timing measurements recorded"
+
+        # Verify measurement structure
+        for measurement in measurements[:3]:  # Check first few measurements
+            assert 'timestamp' in measurement
+            assert 'function' in measurement
+            assert 'duration_ms' in measurement
+            assert 'process_id' in measurement
+            assert isinstance(measurement['duration_ms'], (int, float))
+            assert measurement['duration_ms'] > 0
+
+        # Both sides of the pipeline recorded work: the frame worker's
+        # preprocessing and the detect worker's detections
+        function_names = {m['function'] for m in measurements}
+        assert 'frame_processing' in function_names, (
+            f"No frame worker timing recorded. Functions: {function_names}")
+        assert 'face_detection' in function_names, (
+            f"No detect worker timing recorded. Functions: {function_names}")
+
+    def test_video_processing_frame_detection(self, pipeline_run):
         """Test that video processing includes frame detection logging."""
-        # Create a simple config without timing complexity
-        simple_config = {
-            "receivers": [
-                {
-                    "name": "video_test",
-                    "type": "file", 
-                    "source": str(self.video_path)
-                }
-            ],
-            "preprocessors": [
-                {
-                    "name": "resize",
-                    "type": "resize",
-                    "width": 320,
-                    "height": 240
-                }
-            ],
-            "detectors": [
-                {
-                    "name": "face_detector",
-                    "type": "face_detector",
-                    "variant": "dlib",
-                    "frequency_ms": 500,
-                    "device": "cpu"
-                }
-            ]
-        }
-        
-        simple_config_path = os.path.join(self.temp_dir, 'simple_config.json')
-        with open(simple_config_path, 'w') as f:
-            json.dump(simple_config, f, indent=2)
-        
-        # Set up environment
-        env = os.environ.copy()
-        env['PYTHONPATH'] = str(Path(__file__).parent.parent / 'src')
-        
-        # Run video processing
-        cmd = [
-            sys.executable, '-m', 'cvkitworker',
-            '--config', simple_config_path
-        ]
-        
-        process = subprocess.Popen(
-            cmd,
-            env=env,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE, 
-            text=True,
-            cwd=str(Path(__file__).parent.parent)
-        )
-        
-        try:
-            stdout, stderr = process.communicate(timeout=3)
-        except subprocess.TimeoutExpired:
-            process.terminate()
-            try:
-                stdout, stderr = process.communicate(timeout=1)
-            except subprocess.TimeoutExpired:
-                process.kill()
-                stdout, stderr = process.communicate()
-        
-        # Combine output for analysis
-        all_output = stdout + stderr
-        
+        all_output = pipeline_run["output"]
+
         # Verify key processing indicators
-        processing_indicators = [
-            'Loaded video file',
-            'FrameWorker started',
-            'Frame shape:',
-            'face detector',
-            'DetectWorker started'
-        ]
-        
-        found_indicators = []
-        for indicator in processing_indicators:
-            if indicator.lower() in all_output.lower():
-                found_indicators.append(indicator)
-        
-        # Print debug info if needed
-        if len(found_indicators) < 2:
-            print(f"Video processing indicators found: {found_indicators}")
-            print(f"Full output:\n{all_output}")
-        
-        self.assertGreaterEqual(
-            len(found_indicators), 2,
-            f"Expected video processing indicators. Found: {found_indicators}"
-        )
+        found_indicators = find_indicators(PROCESSING_INDICATORS, all_output)
+
+        assert len(found_indicators) >= 2, (
+            f"Expected video processing indicators. Found: {found_indicators}\n"
+            f"Full output:\n{all_output}")
 
 
 @pytest.mark.integration
 @pytest.mark.video
 @pytest.mark.slow
-class TestVideoProcessingIntegration(unittest.TestCase):
+class TestVideoProcessingIntegration:
     """Integration tests for video processing workflow."""
-    
-    def setUp(self):
-        self.temp_dir = tempfile.mkdtemp()
-        self.video_path = Path(__file__).parent.parent / 'test_videos' / 'big_buck_bunny_480p.mp4'
-    
-    def tearDown(self):
-        import shutil
-        shutil.rmtree(self.temp_dir, ignore_errors=True)
-    
-    def test_video_file_cli_flag(self):
-        """Test using --file CLI flag for video processing."""
-        if not self.video_path.exists():
-            self.skipTest("Test video file not available")
-        
-        # Set up environment
-        env = os.environ.copy()
-        env['PYTHONPATH'] = str(Path(__file__).parent.parent / 'src')
-        
-        # Test --file flag
-        cmd = [
-            sys.executable, '-m', 'cvkitworker',
-            '--file', str(self.video_path)
-        ]
-        
-        process = subprocess.Popen(
-            cmd,
-            env=env,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            cwd=str(Path(__file__).parent.parent)
-        )
-        
-        try:
-            stdout, stderr = process.communicate(timeout=4)
-        except subprocess.TimeoutExpired:
-            process.terminate()
-            try:
-                stdout, stderr = process.communicate(timeout=2)
-            except subprocess.TimeoutExpired:
-                process.kill()
-                stdout, stderr = process.communicate()
-        
-        # Verify the --file flag works
-        all_output = stdout + stderr
-        
-        success_indicators = [
-            'video file',
-            'FrameWorker started',
-            str(self.video_path.name)
-        ]
-        
-        found = [indicator for indicator in success_indicators 
-                if indicator.lower() in all_output.lower()]
-        
-        self.assertGreater(
-            len(found), 0,
-            f"--file flag test failed. Output: {all_output[:500]}..."
-        )
-
-
-if __name__ == '__main__':
-    # Create test suite
-    loader = unittest.TestLoader()
-    suite = unittest.TestSuite()
-    
-    # Add test classes
-    suite.addTests(loader.loadTestsFromTestCase(TestVideoProcessing))
-    suite.addTests(loader.loadTestsFromTestCase(TestVideoProcessingIntegration))
-    
-    # Run tests
-    runner = unittest.TextTestRunner(verbosity=2)
-    result = runner.run(suite)
-    
-    # Exit with appropriate code
-    exit(0 if result.wasSuccessful() else 1)
\ No newline at end of file
+
+    def test_video_file_cli_flag(self, run_logged):
+        """Test the config the --file CLI flag builds for video processing."""
+        if not VIDEO_PATH.exists():
+            pytest.skip("Test video file not available")
+
+        from cvkitworker.utils.config_utils import build_file_config
+
+        exit_code, all_output = run_logged(build_file_config(str(VIDEO_PATH)),
+                                           STARTUP_FRAMES)
+
+        found = find_indicators(FILE_FLAG_INDICATORS, all_output)
+
+        assert len(found) > 0, f"--file flag test failed. Output: {all_output[:500]}..."
+
+
+@pytest.mark.integration
+class TestNoopPipeline:
+    """Run the pipeline end to end on a synthetic video with the noop
+    detector, which needs no model libraries installed."""
+
+    def test_noop_pipeline_runs_without_dlib(self, tmp_path, run_logged):
+        video_path = tmp_path / 'synthetic.mp4'
+        write_synthetic_video(video_path)
+        config = build_config(tmp_path / 'video_timing.jsonl')
+        config["receivers"][0]["source"] = str(video_path)
+
+        exit_code, output = run_logged(config, max_frames=10)
+
+        assert exit_code == 0
+        # Logged after the worker has built its detector from the config
+        assert 'DetectWorker started' in output, output
+        assert 'dlib' not in output, output
+
+    def test_failed_detect_worker_fails_pipeline(self, tmp_path, run_logged):
+        """Test a detect worker that cannot build its detector fails the run."""
+        video_path = tmp_path / 'synthetic.mp4'
+        write_synthetic_video(video_path)
+        config = build_config(tmp_path / 'video_timing.jsonl')
+        config["receivers"][0]["source"] = str(video_path)
+        config["detectors"][0]["variant"] = "unknown"
+
+        exit_code, output = run_logged(config, max_frames=10, check=False)
+
+        assert exit_code == 1
+        assert 'Workers exited with an error' in output, output
@@ -3,221 +3,123 @@
 Test cases for worker configuration functionality.
 """
 
-import unittest
-import os
 import json
-import tempfile
 import sys
-from pathlib import Path
 
-# Add src to path
-sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+import pytest
 
 from cvkitworker.config.parse_config import ConfigParser
 
 
-class TestWorkerConfiguration(unittest.TestCase):
+# (name, config, CVKIT_WORKERS value or None, expected worker count).
+# Invalid, negative and zero counts fall back to the next source.
+WORKER_COUNT_CASES = [
+    ("default", {}, None, 2),
+    ("object", {"workers": {"detect_workers": 4}}, None, 4),
+    ("int", {"workers": 6}, None, 6),
+    ("env", {}, "8", 8),
+    ("env_over_config", {"workers": {"detect_workers": 3}}, "5", 5),
+    ("invalid_env", {"workers": {"detect_workers": 3}}, "invalid", 3),
+    ("negative_env", {}, "-1", 2),
+    ("zero_env", {"workers": {"detect_workers": 3}}, "0", 3),
+    ("padded_env", {}, " 7 ", 7),
+    ("non_ascii_digit_env", {}, "\u00b2", 2),
+    ("zero", {"workers": {"detect_workers": 0}}, None, 2),
+    ("large", {"workers": {"detect_workers": 100}}, None, 100),
+    ("string_number", {"workers": {"detect_workers": "4"}}, None, 4),
+]
+
+# (name, config, expected detect_workers) for get_workers_config()
+WORKERS_CONFIG_CASES = [
+    ("default", {}, 2),
+    ("object", {"workers": {"detect_workers": 4, "frame_workers": 1}}, 4),
+    ("int", {"workers": 6}, 6),
+]
+
+# Configs below are shared by every run of their test and only ever read;
+# they stay plain dicts because ConfigParser checks for dict sections
+OBJECT_CONFIG = {
+    "workers": {
+        "detect_workers": 4,
+        "frame_workers": 1
+    }
+}
+
+CUSTOM_SETTING_CONFIG = {
+    "workers": {
+        "detect_workers": 4,
+        "custom_setting": "test"
+    }
+}
+
+
+class TestWorkerConfiguration:
     """Test worker configuration parsing and priority."""
     
-    def setUp(self):
-        self.temp_dir = tempfile.mkdtemp()
-        # Clear environment variables that might affect tests
-        self.original_env = os.environ.get('CVKIT_WORKERS')
-        if 'CVKIT_WORKERS' in os.environ:
-            del os.environ['CVKIT_WORKERS']
+    @pytest.fixture(autouse=True)
+    def clear_env(self, monkeypatch):
+        """Run without CVKIT_WORKERS; monkeypatch restores it afterwards."""
+        monkeypatch.delenv('CVKIT_WORKERS', raising=False)
     
-    def tearDown(self):
-        import shutil
-        shutil.rmtree(self.temp_dir, ignore_errors=True)
-        
-        # Restore original environment
-        if self.original_env is not None:
-            os.environ['CVKIT_WORKERS'] = self.original_env
-        elif 'CVKIT_WORKERS' in os.environ:
-            del os.environ['CVKIT_WORKERS']
+    @pytest.mark.parametrize(
+        "config, env, expected",
+        [case[1:] for case in WORKER_COUNT_CASES],
+        ids=[case[0] for case in WORKER_COUNT_CASES])
+    def test_worker_count(self, monkeypatch, config, env, expected):
+        """Test worker count for each (config, CVKIT_WORKERS) combination."""
+        if env is not None:
+            monkeypatch.setenv('CVKIT_WORKERS', env)
+        parser = ConfigParser(config=config)
+        assert parser.get_worker_count() == expected
     
-    def test_default_worker_count(self):
-        """Test default worker count when no configuration is provided."""
-        config = {}
-        config_path = os.path.join(self.temp_dir, 'default_config.json')
+    def test_environment_read_at_construction(self, monkeypatch):
+        """Test CVKIT_WORKERS is read when the parser is created."""
+        monkeypatch.setenv('CVKIT_WORKERS', '8')
+        parser = ConfigParser(config={})
+        monkeypatch.delenv('CVKIT_WORKERS')
         
-        with open(config_path, 'w') as f:
-            json.dump(config, f)
-        
-        parser = ConfigParser(config_path)
-        
-        self.assertEqual(parser.get_worker_count(), 2, "Default worker count should be 2")
-        
-        workers_config = parser.get_workers_config()
-        self.assertEqual(workers_config['detect_workers'], 2)
-        self.assertEqual(workers_config['frame_workers'], 1)
+        assert parser.get_worker_count() == 8
     
-    def test_config_file_worker_count_object(self):
-        """Test worker count from config file using object format."""
-        config = {
-            "workers": {
-                "detect_workers": 4,
-                "frame_workers": 1
-            }
-        }
-        config_path = os.path.join(self.temp_dir, 'workers_config.json')
-        
-        with open(config_path, 'w') as f:
-            json.dump(config, f)
-        
-        parser = ConfigParser(config_path)
-        
-        self.assertEqual(parser.get_worker_count(), 4, "Should read detect_workers from config")
-        
-        workers_config = parser.get_workers_config()
-        self.assertEqual(workers_config['detect_workers'], 4)
-        self.assertEqual(workers_config['frame_workers'], 1)
-    
-    def test_config_file_worker_count_integer(self):
-        """Test worker count from config file using integer format (backward compatibility)."""
-        config = {
-            "workers": 6
-        }
-        config_path = os.path.join(self.temp_dir, 'workers_int_config.json')
-        
-        with open(config_path, 'w') as f:
-            json.dump(config, f)
-        
-        parser = ConfigParser(config_path)
-        
-        self.assertEqual(parser.get_worker_count(), 6, "Should read integer workers from config")
-        
-        workers_config = parser.get_workers_config()
-        self.assertEqual(workers_config['detect_workers'], 6)
-        self.assertEqual(workers_config['frame_workers'], 1)
+    @pytest.mark.parametrize(
+        "config, detect_workers",
+        [case[1:] for case in WORKERS_CONFIG_CASES],
+        ids=[case[0] for case in WORKERS_CONFIG_CASES])
+    def test_workers_config_defaults(self, config, detect_workers):
+        """Test get_workers_config fills in detect and frame workers."""
+        workers_config = ConfigParser(config=config).get_workers_config()
+        assert workers_config['detect_workers'] == detect_workers
+        assert workers_config['frame_workers'] == 1
     
-    def test_environment_variable_worker_count(self):
-        """Test worker count from environment variable."""
-        os.environ['CVKIT_WORKERS'] = '8'
-        
-        config = {}
-        config_path = os.path.join(self.temp_dir, 'env_config.json')
-        
-        with open(config_path, 'w') as f:
-            json.dump(config, f)
+    def test_config_file_worker_count(self, tmp_path):
+        """Test worker count read from a config file."""
+        # Covers ConfigParser's file path; the other tests pass their
+        # config in memory
+        config_path = tmp_path / 'config.json'
+        config_path.write_text(json.dumps(OBJECT_CONFIG))
         
         parser = ConfigParser(config_path)
         
-        self.assertEqual(parser.get_worker_count(), 8, "Should read workers from environment variable")
-    
-    def test_environment_variable_priority_over_config(self):
-        """Test that environment variable takes priority over config file."""
-        os.environ['CVKIT_WORKERS'] = '5'
-        
-        config = {
-            "workers": {
-                "detect_workers": 3
-            }
-        }
-        config_path = os.path.join(self.temp_dir, 'priority_config.json')
-        
-        with open(config_path, 'w') as f:
-            json.dump(config, f)
-        
-        parser = ConfigParser(config_path)
-        
-        self.assertEqual(parser.get_worker_count(), 5, "Environment variable should override config file")
-    
-    def test_invalid_environment_variable(self):
-        """Test handling of invalid environment variable values."""
-        os.environ['CVKIT_WORKERS'] = 'invalid'
-        
-        config = {
-            "workers": {
-                "detect_workers": 3
-            }
-        }
-        config_path = os.path.join(self.temp_dir, 'invalid_env_config.json')
-        
-        with open(config_path, 'w') as f:
-            json.dump(config, f)
-        
-        parser = ConfigParser(config_path)
-        
-        # Should fall back to config file value when env var is invalid
-        self.assertEqual(parser.get_worker_count(), 3, "Should fall back to config when env var is invalid")
-    
-    def test_negative_worker_count_rejected(self):
-        """Test that negative worker counts are rejected."""
-        os.environ['CVKIT_WORKERS'] = '-1'
-        
-        config = {}
-        config_path = os.path.join(self.temp_dir, 'negative_config.json')
-        
-        with open(config_path, 'w') as f:
-            json.dump(config, f)
-        
-        parser = ConfigParser(config_path)
-        
-        # Should fall back to default when negative value provided
-        self.assertEqual(parser.get_worker_count(), 2, "Should reject negative worker count")
-    
-    def test_zero_worker_count_rejected(self):
-        """Test that zero worker count is rejected."""
-        config = {
-            "workers": {
-                "detect_workers": 0
-            }
-        }
-        config_path = os.path.join(self.temp_dir, 'zero_config.json')
-        
-        with open(config_path, 'w') as f:
-            json.dump(config, f)
-        
-        parser = ConfigParser(config_path)
-        
-        # Should fall back to default when zero value provided
-        self.assertEqual(parser.get_worker_count(), 2, "Should reject zero worker count")
+        assert parser.get_worker_count() == 4, "Should read detect_workers from config"
     
     def test_workers_config_complete(self):
         """Test that get_workers_config returns complete configuration."""
-        config = {
-            "workers": {
-                "detect_workers": 4,
-                "custom_setting": "test"
-            }
-        }
-        config_path = os.path.join(self.temp_dir, 'complete_config.json')
-        
-        with open(config_path, 'w') as f:
-            json.dump(config, f)
-        
-        parser = ConfigParser(config_path)
+        parser = ConfigParser(config=CUSTOM_SETTING_CONFIG)
         workers_config = parser.get_workers_config()
         
         # Should include both default and custom settings
-        self.assertEqual(workers_config['detect_workers'], 4)
-        self.assertEqual(workers_config['frame_workers'], 1)
-        self.assertEqual(workers_config['custom_setting'], "test")
+        assert workers_config['detect_workers'] == 4
+        assert workers_config['frame_workers'] == 1
+        assert workers_config['custom_setting'] == "test"
     
-    def test_edge_cases(self):
-        """Test various edge cases in worker configuration."""
-        # Test very large worker count
-        config = {"workers": {"detect_workers": 100}}
-        config_path = os.path.join(self.temp_dir, 'large_config.json')
+    def test_in_memory_config(self):
+        """Test that a config dictionary is used without reading a file."""
+        config = {"workers": {"detect_workers": 3}}
         
-        with open(config_path, 'w') as f:
-            json.dump(config, f)
-        
-        parser = ConfigParser(config_path)
-        self.assertEqual(parser.get_worker_count(), 100, "Should accept large worker counts")
+        parser = ConfigParser(config=config)
         
-        # Test string number in config
-        config = {"workers": {"detect_workers": "4"}}
-        config_path = os.path.join(self.temp_dir, 'string_config.json')
-        
-        with open(config_path, 'w') as f:
-            json.dump(config, f)
-        
-        parser = ConfigParser(config_path)
-        self.assertEqual(parser.get_worker_count(), 4, "Should convert string numbers")
+        assert parser.config_file is None
+        assert parser.get_worker_count() == 3, "Should read workers from in-memory config"
 
 
 if __name__ == '__main__':
-    # Run tests
-    unittest.main(verbosity=2)
\ No newline at end of file
+    sys.exit(pytest.main([__file__, "-v"]))